@@ -3,30 +3,94 @@ Carte Blanche - Action Handler Module
 실제 PC 조작 (GUI Automation) 기능
 """
 import os
+import sys
 import subprocess
 import time
 from datetime import datetime
 
 # GUI 자동화 라이브러리
 import pyautogui
-import pyperclip
+
+from src.log import get_logger
+
+logger = get_logger("actions")
+
+# 뷰어 프로세스를 부모와 분리해서 실행 (Windows 전용 플래그, 그 외 OS에서는 0)
+_DETACHED_FLAGS = getattr(subprocess, 'DETACHED_PROCESS', 0) | getattr(subprocess, 'CREATE_NEW_PROCESS_GROUP', 0)
+
+# Windows 클립보드 직접 접근 (pyperclip 경유 없이 Win32 API 호출)
+if sys.platform == 'win32':
+    import ctypes
+    from ctypes import wintypes
+    
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+    
+    _u32 = ctypes.WinDLL('user32', use_last_error=True)
+    _k32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    _u32.OpenClipboard.argtypes = [wintypes.HWND]
+    _u32.OpenClipboard.restype = wintypes.BOOL
+    _u32.EmptyClipboard.restype = wintypes.BOOL
+    _u32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+    _u32.SetClipboardData.restype = wintypes.HANDLE
+    _u32.CloseClipboard.restype = wintypes.BOOL
+    _k32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+    _k32.GlobalAlloc.restype = wintypes.HGLOBAL
+    _k32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+    _k32.GlobalLock.restype = ctypes.c_void_p
+    _k32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+    _k32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+    
+    def _set_clipboard_text(text: str):
+        """클립보드에 유니코드 텍스트 설정 (CF_UNICODETEXT)"""
+        data = text.encode('utf-16-le') + b'\x00\x00'
+        handle = _k32.GlobalAlloc(GMEM_MOVEABLE, len(data))
+        if not handle:
+            raise ctypes.WinError(ctypes.get_last_error())
+        ptr = _k32.GlobalLock(handle)
+        ctypes.memmove(ptr, data, len(data))
+        _k32.GlobalUnlock(handle)
+        
+        # 다른 프로그램이 클립보드를 잡고 있을 수 있으므로 잠시 재시도
+        for _ in range(10):
+            if _u32.OpenClipboard(None):
+                break
+            time.sleep(0.01)
+        else:
+            _k32.GlobalFree(handle)
+            raise ctypes.WinError(ctypes.get_last_error())
+        try:
+            _u32.EmptyClipboard()
+            if not _u32.SetClipboardData(CF_UNICODETEXT, handle):
+                # 소유권이 넘어가지 않았으면 직접 해제
+                _k32.GlobalFree(handle)
+                raise ctypes.WinError(ctypes.get_last_error())
+        finally:
+            _u32.CloseClipboard()
+else:
+    def _set_clipboard_text(text: str):
+        """클립보드에 텍스트 설정 (Windows 외 환경은 pyperclip 사용)"""
+        import pyperclip
+        pyperclip.copy(text)
 
 
 class ActionHandler:
     """PC GUI 조작을 수행하는 핸들러"""
     
-    def __init__(self):
+    def __init__(self, paste_delay: float = 0.05):
         # pyautogui 안전 설정
         pyautogui.FAILSAFE = True  # 마우스를 왼쪽 상단으로 이동하면 중지
         pyautogui.PAUSE = 0.1  # 각 동작 사이 딜레이
+        self.paste_delay = paste_delay  # 붙여넣기 후 대기 시간 (초)
     
-    def open_notepad_and_write(self, content: str, save_path: str = None) -> dict:
+    def open_notepad_and_write(self, content: str, save_path: str = None, need_pid: bool = False) -> dict:
         """
         내용을 파일로 저장하고 메모장에서 엽니다.
         
         Args:
             content: 저장할 내용
             save_path: 저장할 전체 경로 (None이면 자동 생성)
+            need_pid: 메모장 프로세스 ID가 필요한지 여부 (Windows에서 False면 더 빠른 ShellExecute 사용)
         
         Returns:
             결과 딕셔너리
@@ -34,33 +98,40 @@ class ActionHandler:
         try:
             # 1. 저장 경로 설정
             if save_path is None:
-                save_path = f"완료_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-            
-            print(f"[ActionHandler] 파일 저장 중: {save_path}")
+                save_path = f"완료_{time.strftime('%Y%m%d_%H%M%S')}.txt"
             
             # 2. 직접 파일로 저장 (GUI 저장 대신)
             with open(save_path, 'w', encoding='utf-8') as f:
                 f.write(content)
             
-            print("[ActionHandler] 파일 저장 완료!")
-            
             # 3. 저장된 파일을 메모장으로 열기 (확인용)
-            print("[ActionHandler] 메모장에서 열기...")
-            process = subprocess.Popen(['notepad.exe', save_path])
+            # 창이 뜨기를 기다리지 않음 (창이 필요한 후속 작업이 있으면 호출하는 쪽에서 wait_for_window로 대기)
+            if sys.platform == 'win32' and not need_pid:
+                # ShellExecuteW로 바로 실행 (자식 프로세스 배관 설정 없음, PID는 알 수 없음)
+                os.startfile('notepad.exe', arguments=f'"{save_path}"')
+                pid = None
+            else:
+                # 표준 입출력이 필요 없으므로 분리 실행
+                process = subprocess.Popen(
+                    ['notepad.exe', save_path],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    creationflags=_DETACHED_FLAGS,
+                    close_fds=True
+                )
+                pid = process.pid
             
-            # 메모장이 열릴 때까지 잠시 대기
-            time.sleep(1)
-            
-            print(f"[ActionHandler] 완료: {save_path}")
+            logger.info("[ActionHandler] save=%s pid=%s", save_path, pid)
             return {
                 "success": True, 
                 "message": f"저장 완료: {save_path}",
                 "output_file": save_path,
-                "process_id": process.pid
+                "process_id": pid
             }
             
         except Exception as e:
-            print(f"[ActionHandler] 오류 발생: {str(e)}")
+            logger.error("[ActionHandler] 오류 발생: %s", e)
             return {"success": False, "error": str(e)}
     
     def _type_text_korean(self, text: str):
@@ -69,11 +140,11 @@ class ActionHandler:
         (pyautogui는 한글 직접 입력이 안 되므로)
         """
         # 클립보드에 텍스트 복사
-        pyperclip.copy(text)
+        _set_clipboard_text(text)
         
         # Ctrl+V로 붙여넣기
         pyautogui.hotkey('ctrl', 'v')
-        time.sleep(0.3)
+        time.sleep(self.paste_delay)
     
     def close_active_window(self):
         """현재 활성 창을 닫습니다 (Alt+F4)"""
@@ -98,47 +169,118 @@ class ActionHandler:
     def hotkey(self, *keys):
         """단축키를 누릅니다 (예: hotkey('ctrl', 'c'))"""
         pyautogui.hotkey(*keys)
+import atexit
 import json
+import threading
+
+# 선택적 고속 JSON 라이브러리 (없으면 표준 json 사용)
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # 처리 로그 파일 경로
 PROCESSED_LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'processed_log.json')
 
+# 처리 로그 메모리 캐시 (최초 1회만 읽고, 저장은 디바운스하여 모아서 기록)
+_LOG_CACHE = None
+_LOG_DIRTY = False
+_LOG_LOCK = threading.Lock()
+_FLUSH_TIMER = None
+_FLUSH_DELAY = 1.0  # 마지막 기록 후 디스크 저장까지 대기 시간 (초)
 
-def load_processed_log() -> dict:
-    """처리 완료된 파일 목록 로드"""
+
+def _read_processed_log() -> dict:
+    """디스크에서 처리 로그 읽기"""
     try:
         if os.path.exists(PROCESSED_LOG_PATH):
-            with open(PROCESSED_LOG_PATH, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(PROCESSED_LOG_PATH, 'rb') as f:
+                data = f.read()
+            return orjson.loads(data) if orjson else json.loads(data)
     except:
         pass
     return {"gui_actions": {}}
 
 
+def _get_log_locked() -> dict:
+    """캐시된 로그 반환 (_LOG_LOCK 보유 상태에서 호출)"""
+    global _LOG_CACHE
+    if _LOG_CACHE is None:
+        _LOG_CACHE = _read_processed_log()
+    return _LOG_CACHE
+
+
+def load_processed_log() -> dict:
+    """처리 완료된 파일 목록 로드 (캐시된 동일 딕셔너리 반환)"""
+    with _LOG_LOCK:
+        return _get_log_locked()
+
+
 def save_processed_log(log: dict):
     """처리 완료된 파일 목록 저장"""
+    if orjson:
+        payload = orjson.dumps(log, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps(log, indent=2, ensure_ascii=False).encode('utf-8')
+    
+    # 임시 파일에 쓴 뒤 교체 (쓰기 도중 중단되어도 기존 로그 보존)
     os.makedirs(os.path.dirname(PROCESSED_LOG_PATH), exist_ok=True)
-    with open(PROCESSED_LOG_PATH, 'w', encoding='utf-8') as f:
-        json.dump(log, f, indent=2, ensure_ascii=False)
+    tmp_path = PROCESSED_LOG_PATH + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, PROCESSED_LOG_PATH)
+
 
+def _flush():
+    """변경된 로그가 있으면 디스크에 저장"""
+    global _LOG_DIRTY, _FLUSH_TIMER
+    with _LOG_LOCK:
+        _FLUSH_TIMER = None
+        if not _LOG_DIRTY or _LOG_CACHE is None:
+            return
+        try:
+            save_processed_log(_LOG_CACHE)
+            _LOG_DIRTY = False
+        except Exception as e:
+            logger.error("[ActionHandler] 처리 로그 저장 실패: %s", e)
+
+
+def _schedule_flush():
+    """디바운스 저장 예약 (_LOG_LOCK 보유 상태에서 호출)"""
+    global _FLUSH_TIMER
+    if _FLUSH_TIMER is not None:
+        _FLUSH_TIMER.cancel()
+    _FLUSH_TIMER = threading.Timer(_FLUSH_DELAY, _flush)
+    _FLUSH_TIMER.daemon = True
+    _FLUSH_TIMER.start()
 
-def mark_as_processed(file_path: str, action_type: str):
-    """파일을 처리 완료로 기록"""
-    log = load_processed_log()
-    if action_type not in log:
-        log[action_type] = {}
-    log[action_type][file_path] = {
-        "processed_at": datetime.now().isoformat(),
-        "mtime": os.path.getmtime(file_path)
-    }
-    save_processed_log(log)
+
+# 프로세스 종료 시 남은 변경분 저장
+atexit.register(_flush)
+
+
+def mark_as_processed(file_path: str, action_type: str, mtime: float = None):
+    """파일을 처리 완료로 기록 (mtime을 이미 알고 있으면 넘겨서 stat 생략)"""
+    global _LOG_DIRTY
+    if mtime is None:
+        mtime = os.path.getmtime(file_path)
+    with _LOG_LOCK:
+        log = _get_log_locked()
+        if action_type not in log:
+            log[action_type] = {}
+        log[action_type][file_path] = {
+            "processed_at": datetime.now().isoformat(),
+            "mtime": mtime
+        }
+        _LOG_DIRTY = True
+        _schedule_flush()
 
 
 def is_already_processed(file_path: str, action_type: str) -> bool:
     """파일이 이미 처리되었는지 확인 (수정 시각 기준)"""
-    log = load_processed_log()
-    if action_type in log and file_path in log[action_type]:
-        recorded = log[action_type][file_path]
+    with _LOG_LOCK:
+        recorded = _get_log_locked().get(action_type, {}).get(file_path)
+    if recorded is not None:
         current_mtime = os.path.getmtime(file_path)
         return recorded.get("mtime") == current_mtime
     return False
@@ -156,8 +298,9 @@ def process_output_and_open_notepad(file_path: str, output_path: str = None) ->
         처리 결과
     """
     try:
-        # 파일 내용 읽기
+        # 파일 내용 읽기 (처리 기록용 수정 시각은 열린 파일에서 함께 확인)
         with open(file_path, 'r', encoding='utf-8') as f:
+            mtime = os.fstat(f.fileno()).st_mtime
             content = f.read()
         
         # 저장 파일명 생성 (notepad_원본파일명)
@@ -171,18 +314,13 @@ def process_output_and_open_notepad(file_path: str, output_path: str = None) ->
         else:
             full_save_path = save_filename
         
-        print(f"\n[ActionHandler] 파일 처리 시작: {original_filename}")
-        print(f"[ActionHandler] 저장 위치: {full_save_path}")
-        print("[ActionHandler] ⚠️ GUI 작업 중 - 마우스/키보드 조작을 피해주세요!")
-        
         # 메모장에 열고 저장
         handler = ActionHandler()
         result = handler.open_notepad_and_write(content, full_save_path)
         
         # 성공 시 처리 완료로 기록
         if result.get("success"):
-            mark_as_processed(file_path, "open_in_notepad")
-            print("[ActionHandler] ✅ 처리 완료 기록됨")
+            mark_as_processed(file_path, "open_in_notepad", mtime=mtime)
         
         return result
         
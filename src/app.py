@@ -4,21 +4,30 @@ Carte Blanche - Flask Web Server
 """
 import os
 import sys
+import copy
 import time
 import json
+import queue
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 
 # 프로젝트 루트 경로 설정
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory, stream_with_context
 from flask_cors import CORS
 
 from src.engine import RuleEngine
 from src.watcher import get_watcher, FileEventHandler
+from src.workers import execute_action, is_gui_action
+from src.workflow_engine import _load_workflow_cached
+from src.tools import wait_for_window
+from src.log import get_logger
 from watchdog.observers import Observer
 
+logger = get_logger("app")
+
 app = Flask(__name__, static_folder='../web')
 CORS(app)
 
@@ -29,16 +38,26 @@ rule_engine = _watcher.rule_engine
 
 # ==================== Static Files ====================
 
+# 정적 파일 캐시 시간 (초) - HTML은 개발 중 변경이 바로 보이도록 매번 재검증
+STATIC_MAX_AGE = 3600
+
+
+def _send_static(filename: str):
+    """ETag/If-Modified-Since 조건부 응답 + 캐시 헤더로 정적 파일 전송"""
+    max_age = 0 if filename.endswith('.html') else STATIC_MAX_AGE
+    return send_from_directory(app.static_folder, filename, conditional=True, max_age=max_age)
+
+
 @app.route('/')
 def index():
     """메인 페이지"""
-    return send_from_directory(app.static_folder, 'index.html')
+    return _send_static('index.html')
 
 
 @app.route('/<path:filename>')
 def static_files(filename):
     """정적 파일 서빙"""
-    return send_from_directory(app.static_folder, filename)
+    return _send_static(filename)
 
 
 # ==================== Rules API ====================
@@ -125,11 +144,12 @@ def start_watcher():
         watcher.event_handler = FileEventHandler(watcher.rule_engine)
     
     # 백그라운드 스레드에서 시작
+    watcher._ready.clear()
     thread = threading.Thread(target=watcher.start, daemon=True)
     thread.start()
     
-    # 시작 확인을 위해 잠시 대기
-    time.sleep(0.5)
+    # 시작 완료 신호를 받을 때까지 대기 (고정 대기 대신 준비되는 즉시 응답)
+    watcher._ready.wait(timeout=2.0)
     
     return jsonify({"success": True, "message": "Watcher started"})
 
@@ -153,6 +173,32 @@ def reload_rules():
 
 # ==================== Batch Processing API ====================
 
+def _snapshot_mtimes(dir_path: str) -> dict:
+    """폴더 내 항목별 수정 시각 스냅샷 {파일명: mtime} (없는 폴더면 빈 딕셔너리)"""
+    if not os.path.isdir(dir_path):
+        return {}
+    mtimes = {}
+    with os.scandir(dir_path) as it:
+        for e in it:
+            try:
+                mtimes[e.name] = e.stat().st_mtime
+            except OSError:
+                # 깨진 심볼릭 링크나 스캔 중 삭제된 항목은 건너뜀
+                continue
+    return mtimes
+
+
+def _load_workflow(path: str) -> dict:
+    """워크플로우 JSON 로드 (워크플로우 엔진과 같은 파싱 캐시 사용, 캐시를 바꾸지 않도록 복사본 반환)"""
+    return copy.deepcopy(_load_workflow_cached(path, os.stat(path).st_mtime_ns))
+
+
+def _get_workflow_path(action: dict) -> str:
+    """규칙 액션에 지정된 워크플로우 파일 경로"""
+    wf_name = action.get('args', {}).get('workflow_name', 'workflow.json')
+    return os.path.join(WORKFLOWS_DIR, wf_name if wf_name.endswith('.json') else f"{wf_name}.json")
+
+
 @app.route('/api/rules/<rule_id>/scan', methods=['GET'])
 def scan_unprocessed_files(rule_id):
     """규칙에 맞는 미처리 파일 스캔"""
@@ -163,6 +209,8 @@ def scan_unprocessed_files(rule_id):
     trigger = rule.get('trigger', {})
     input_path = trigger.get('path', '')
     extensions = trigger.get('extensions', [])
+    # 확장자 필터는 요청당 한 번만 소문자 집합으로 변환 (필터가 없으면 None)
+    ext_set = frozenset(e.lower() for e in extensions) if extensions else None
     
     action = rule.get('action', {})
     output_path = action.get('output_path', '')
@@ -179,112 +227,103 @@ def scan_unprocessed_files(rule_id):
         'run_workflow': '워크플로우 실행'
     }
     
-    # Input 폴더의 파일들 스캔
-    unprocessed = []
-    for filename in os.listdir(input_path):
-        file_path = os.path.join(input_path, filename)
-        if not os.path.isfile(file_path):
-            continue
-        
-        # 확장자 체크
-        file_ext = os.path.splitext(filename)[1].lower()
-        if extensions and file_ext not in extensions:
-            continue
-        
+    # Output 폴더는 한 번만 읽어서 파일별 존재 여부/수정 시각을 메모리에서 조회
+    output_mtimes = _snapshot_mtimes(output_path)
+    
+    # 액션 타입별 출력 파일명 규칙 (action_type은 스캔 내내 같으므로 루프 밖에서 한 번만 결정)
+    missing_status = "미처리"
+    if action_type == 'open_in_notepad':
         # GUI 액션 (메모장) - output 파일 존재 여부로 확인
-        if action_type == 'open_in_notepad':
-            output_file = os.path.join(output_path, f"notepad_{filename}")
-            
-            if not os.path.exists(output_file):
-                unprocessed.append({
-                    "filename": filename, 
-                    "path": file_path, 
-                    "status": "액션 대기",
-                    "action_type": action_type
-                })
-            elif os.path.getmtime(file_path) > os.path.getmtime(output_file):
-                unprocessed.append({
-                    "filename": filename, 
-                    "path": file_path, 
-                    "status": "업데이트 필요",
-                    "action_type": action_type
-                })
-            continue
+        output_name_for = lambda fn: f"notepad_{fn}"
+        missing_status = "액션 대기"
+    elif action_type == 'process_txt':
+        # 사용자 요청: 기본 텍스트 요약은 summary_로 고정
+        output_name_for = lambda fn: f"summary_{fn}"
+    elif action_type == 'process_xlsx':
+        output_name_for = lambda fn: f"extract_{os.path.splitext(fn)[0]}.txt"
+    elif action_type == 'run_workflow':
+        # 워크플로우 내의 prefix 설정을 동적으로 찾아서 패턴에 추가
+        wf_prefixes = []
+        wf_path = _get_workflow_path(action)
+        if os.path.exists(wf_path):
+            try:
+                for wf_act in _load_workflow(wf_path).get('actions', []):
+                    if wf_act.get('tool') == 'save_to_output':
+                        p = wf_act.get('args', {}).get('prefix', '')
+                        if p: wf_prefixes.insert(0, p)
+            except: pass
+        # 기본 패턴 추가 (커버리지 확보) - summary_를 최우선으로 체크하도록 순서 조정
+        # dict.fromkeys로 순서를 유지하면서 중복 접두사 제거 (같은 파일을 두 번 조회하지 않도록)
+        wf_prefixes = tuple(dict.fromkeys(wf_prefixes + ["", "summary_", "processed_", "처리됨_"]))
         
-        # Output 파일 존재 여부 확인 (파일 처리 액션)
-        if action_type == 'process_txt':
-            # 사용자 요청: 기본 텍스트 요약은 summary_로 고정
-            output_file = os.path.join(output_path, f"summary_{filename}")
-        elif action_type == 'process_xlsx':
-            output_file = os.path.join(output_path, f"extract_{os.path.splitext(filename)[0]}.txt")
-        elif action_type == 'run_workflow':
-            # 워크플로우 내의 prefix 설정을 동적으로 찾아서 패턴에 추가
-            wf_patterns = [filename]
-            # 기본 패턴 추가 (커버리지 확보) - summary_를 최우선으로 체크하도록 순서 조정
-            for p in ["summary_", "processed_", "처리됨_"]:
-                pattern = f"{p}{filename}"
-                if pattern not in wf_patterns: wf_patterns.append(pattern)
-                
-            wf_args = action.get('args', {})
-            wf_name = wf_args.get('workflow_name', 'workflow.json')
-            wf_path = os.path.join(WORKFLOWS_DIR, wf_name if wf_name.endswith('.json') else f"{wf_name}.json")
-            
-            if os.path.exists(wf_path):
+        def output_name_for(fn):
+            for p in wf_prefixes:
+                if f"{p}{fn}" in output_mtimes:
+                    return f"{p}{fn}"
+            return fn # 기본값
+    else:
+        output_name_for = lambda fn: fn
+    
+    # 200 응답을 보내기 시작한 뒤에는 오류를 돌려줄 수 없으므로 폴더는 미리 열어 둠
+    try:
+        input_scan = os.scandir(input_path)
+    except OSError as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    
+    def iter_unprocessed():
+        # Input 폴더의 파일들 스캔 (DirEntry의 캐시된 stat 정보 재사용)
+        with input_scan as it:
+            for entry in it:
                 try:
-                    with open(wf_path, 'r', encoding='utf-8') as f:
-                        wf_data = json.load(f)
-                        for wf_act in wf_data.get('actions', []):
-                            if wf_act.get('tool') == 'save_to_output':
-                                p = wf_act.get('args', {}).get('prefix', '')
-                                if p: wf_patterns.insert(0, f"{p}{filename}")
-                except: pass
-            
-            # 기본 패턴 추가 (커버리지 확보)
-            for p in ["summary_", "processed_", "처리됨_"]:
-                pattern = f"{p}{filename}"
-                if pattern not in wf_patterns: wf_patterns.append(pattern)
+                    if not entry.is_file():
+                        continue
+                    input_mtime = entry.stat().st_mtime
+                except OSError:
+                    # 스캔 중 삭제되었거나 읽을 수 없는 항목은 건너뜀
+                    continue
+                filename = entry.name
                 
-            output_file = os.path.join(output_path, filename) # 기본값
-            for p in wf_patterns:
-                tmp = os.path.join(output_path, p)
-                if os.path.exists(tmp):
-                    output_file = tmp
-                    break
-        else:
-            output_file = os.path.join(output_path, filename)
-        
-        # 미처리 파일 또는 Input이 Output보다 최신인 파일
-        if not os.path.exists(output_file):
-            unprocessed.append({
-                "filename": filename, 
-                "path": file_path, 
-                "status": "미처리",
-                "action_type": action_type
-            })
-        elif os.path.getmtime(file_path) > os.path.getmtime(output_file):
-            unprocessed.append({
-                "filename": filename, 
-                "path": file_path, 
-                "status": "업데이트 필요",
-                "action_type": action_type
-            })
+                # 확장자 체크
+                if ext_set is not None and os.path.splitext(filename)[1].lower() not in ext_set:
+                    continue
+                
+                # 미처리 파일 또는 Input이 Output보다 최신인 파일
+                output_mtime = output_mtimes.get(output_name_for(filename))
+                if output_mtime is None:
+                    status = missing_status
+                elif input_mtime > output_mtime:
+                    status = "업데이트 필요"
+                else:
+                    continue
+                
+                yield {
+                    "filename": filename, 
+                    "path": entry.path, 
+                    "status": status,
+                    "action_type": action_type
+                }
     
-    return jsonify({
-        "success": True,
-        "rule_name": rule.get('name'),
-        "action_type": action_type,
-        "action_label": action_labels.get(action_type, action_type),
-        "unprocessed_files": unprocessed,
-        "count": len(unprocessed)
-    })
+    def generate():
+        # 결과 목록을 메모리에 모으지 않고 파일 단위로 이어서 전송 (응답 형식은 기존과 동일한 JSON)
+        header = json.dumps({
+            "success": True,
+            "rule_name": rule.get('name'),
+            "action_type": action_type,
+            "action_label": action_labels.get(action_type, action_type)
+        })
+        yield header[:-1] + ', "unprocessed_files": ['
+        count = 0
+        for item in iter_unprocessed():
+            yield (', ' if count else '') + json.dumps(item)
+            count += 1
+        yield f'], "count": {count}}}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 
 @app.route('/api/rules/<rule_id>/process-all', methods=['POST'])
 def process_all_files(rule_id):
     """규칙에 맞는 모든 미처리 파일 일괄 처리"""
-    import time
-    from src.workers import execute_action
-    
     rule = rule_engine.get_rule(rule_id)
     if not rule:
         return jsonify({"success": False, "error": "Rule not found"}), 404
@@ -292,6 +331,8 @@ def process_all_files(rule_id):
     trigger = rule.get('trigger', {})
     input_path = trigger.get('path', '')
     extensions = trigger.get('extensions', [])
+    # 확장자 필터는 요청당 한 번만 소문자 집합으로 변환 (필터가 없으면 None)
+    ext_set = frozenset(e.lower() for e in extensions) if extensions else None
     
     action = rule.get('action', {})
     output_path = action.get('output_path', '')
@@ -305,55 +346,76 @@ def process_all_files(rule_id):
     files_to_process = data.get('files', None)
     
     # GUI 액션 여부 판별 (워크플로우 내부 도구 포함)
-    is_gui_action = action_type == 'open_in_notepad'
-    if action_type == 'run_workflow':
-        wf_args = action.get('args', {})
-        wf_name = wf_args.get('workflow_name', 'workflow.json')
-        wf_path = os.path.join(WORKFLOWS_DIR, wf_name if wf_name.endswith('.json') else f"{wf_name}.json")
-        if os.path.exists(wf_path):
-            try:
-                with open(wf_path, 'r', encoding='utf-8') as f:
-                    wf_data = json.load(f)
-                    for wf_act in wf_data.get('actions', []):
-                        if wf_act.get('tool') in ['open_notepad', 'open_excel', 'open_browser']:
-                            is_gui_action = True
-                            break
-            except: pass
+    is_gui = is_gui_action(action_type, action.get('args'))
 
-    if is_gui_action:
+    if is_gui:
         print(f"\n⚠️ [Batch] GUI 액동 일괄 처리 시작 ({action_type}) - 마우스/키보드 조작을 피해주세요!")
     
-    results = []
-    success_count = 0
-    for filename in os.listdir(input_path):
-        file_path = os.path.join(input_path, filename)
-        if not os.path.isfile(file_path):
-            continue
-        
-        # 확장자 체크
-        file_ext = os.path.splitext(filename)[1].lower()
-        if extensions and file_ext not in extensions:
-            continue
-        
-        # 특정 파일만 처리하는 경우
-        if files_to_process and filename not in files_to_process:
-            continue
-        
-        # 액션 실행
-        action_args = action.get('args', {})
+    # 처리 대상 파일 수집
+    targets = []
+    with os.scandir(input_path) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            filename = entry.name
+            
+            # 확장자 체크
+            if ext_set is not None and os.path.splitext(filename)[1].lower() not in ext_set:
+                continue
+            
+            # 특정 파일만 처리하는 경우
+            if files_to_process and filename not in files_to_process:
+                continue
+            
+            targets.append((filename, entry.path))
+    
+    action_args = action.get('args', {})
+    
+    def run_one(file_path):
         try:
-            result = execute_action(action_type, file_path, output_path, args=action_args)
-            if result.get('success'):
-                success_count += 1
-            results.append({"filename": filename, "result": result})
+            return execute_action(action_type, file_path, output_path, args=action_args)
         except Exception as e:
-            results.append({"filename": filename, "result": {"success": False, "error": str(e)}})
-        
-        # GUI 액션은 파일 간 딜레이를 줘서 안정성 확보
-        if is_gui_action:
-            time.sleep(2)  # 2초 대기 (다음 파일을 위해)
+            return {"success": False, "error": str(e)}
+    
+    results = []
+    last_report = time.monotonic()
+    
+    def record(filename, result):
+        # 파일마다 출력하지 않고 100개 또는 1초마다 진행 상황을 한 줄로 요약
+        nonlocal last_report
+        results.append({"filename": filename, "result": result})
+        now = time.monotonic()
+        if len(results) % 100 == 0 or now - last_report >= 1.0:
+            last_report = now
+            logger.info("[Batch] 진행: %d/%d", len(results), len(targets))
+    
+    if is_gui:
+        # GUI 액션은 화면 포커스를 독점해야 하므로 순차 실행
+        for filename, file_path in targets:
+            result = run_one(file_path)
+            record(filename, result)
+            if not result.get("success"):
+                continue  # 실패하면 띄운 창이 없으므로 바로 다음 파일
+            
+            # 다음 파일을 실행하기 전에 이전 파일의 창이 뜰 때까지 대기
+            output_file = result.get("output_file")
+            if output_file:
+                # 메모장 제목에는 저장 파일명이 표시됨
+                wait_for_window(os.path.basename(output_file))
+            else:
+                # 창 제목을 알 수 없는 워크플로우 GUI 도구는 기존처럼 고정 대기
+                time.sleep(2)
+    else:
+        # 파일 처리 액션은 I/O 위주이므로 스레드 풀로 병렬 실행 (결과 순서는 유지)
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4)) as ex:
+            futures = [ex.submit(run_one, file_path) for _, file_path in targets]
+            for (filename, _), fut in zip(targets, futures):
+                record(filename, fut.result())
+    
+    success_count = sum(1 for r in results if r["result"].get('success'))
+    logger.info("[Batch] 완료: %d/%d 성공", success_count, len(results))
     
-    if is_gui_action:
+    if is_gui:
         print("✅ [Batch] GUI 액션 일괄 처리 완료!\n")
     
     return jsonify({
@@ -497,12 +559,14 @@ def test_workflow():
         return jsonify({"success": False, "error": str(e)})
 
 
-@app.route('/api/utils/picker', methods=['GET'])
-def path_picker():
-    """네이티브 파일/폴더 선택창 오픈"""
-    mode = request.args.get('mode', 'folder') # folder or file
-    title = request.args.get('title', '경로 선택')
-    
+# Tk 루트는 한 번만 만들어 재사용 (생성 비용이 크고, Tk는 생성한 스레드에서만 호출 가능)
+# -> 전용 스레드가 숨겨진 루트를 소유하고, 요청 스레드는 큐로 대화상자를 요청
+_PICKER_QUEUE = None
+_PICKER_LOCK = threading.Lock()
+
+
+def _picker_loop(q: queue.Queue, ready: Future):
+    """숨겨진 Tk 루트를 소유하고 선택창 요청을 순서대로 처리하는 스레드"""
     try:
         import tkinter as tk
         from tkinter import filedialog
@@ -510,14 +574,45 @@ def path_picker():
         root = tk.Tk()
         root.withdraw() # 메인 창 숨기기
         root.attributes('-topmost', True) # 창을 최상단으로
-        
-        selected_path = ""
-        if mode == 'folder':
-            selected_path = filedialog.askdirectory(title=title, parent=root)
-        else:
-            selected_path = filedialog.askopenfilename(title=title, parent=root)
-            
-        root.destroy()
+    except Exception as e:
+        ready.set_exception(e)
+        return
+    ready.set_result(None)
+    
+    while True:
+        mode, title, fut = q.get()
+        try:
+            if mode == 'folder':
+                fut.set_result(filedialog.askdirectory(title=title, parent=root))
+            else:
+                fut.set_result(filedialog.askopenfilename(title=title, parent=root))
+        except Exception as e:
+            fut.set_exception(e)
+
+
+def _ask_path(mode: str, title: str) -> str:
+    """선택창을 띄우고 선택된 경로 반환 (취소 시 빈 문자열)"""
+    global _PICKER_QUEUE
+    with _PICKER_LOCK:
+        if _PICKER_QUEUE is None:
+            q, ready = queue.Queue(), Future()
+            threading.Thread(target=_picker_loop, args=(q, ready), daemon=True).start()
+            ready.result()  # Tk 초기화 실패 시 예외 전달 (다음 요청에서 재시도)
+            _PICKER_QUEUE = q
+    
+    fut = Future()
+    _PICKER_QUEUE.put((mode, title, fut))
+    return fut.result()
+
+
+@app.route('/api/utils/picker', methods=['GET'])
+def path_picker():
+    """네이티브 파일/폴더 선택창 오픈"""
+    mode = request.args.get('mode', 'folder') # folder or file
+    title = request.args.get('title', '경로 선택')
+    
+    try:
+        selected_path = _ask_path(mode, title)
         
         if selected_path:
             # 윈도우 경로 구분자 정규화 (Backslash -> Slash)
@@ -531,11 +626,21 @@ def path_picker():
 
 
 if __name__ == '__main__':
-    import json
     print("\n=== Carte Blanche Web Server ===")
     print("URL: http://localhost:5000")
     print("API: http://localhost:5000/api/rules")
     print("Workflow Editor: http://localhost:5000/workflow.html")
     print("================================\n")
-    app.run(debug=True, port=5000)
+    
+    if os.environ.get('CB_DEBUG') == '1':
+        # 개발 모드: Flask 개발 서버 (디버거 + 자동 리로드)
+        app.run(debug=True, port=5000)
+    else:
+        # 기본: 멀티스레드 WSGI 서버 (스캔/일괄 처리 중에도 상태 조회 요청이 막히지 않음)
+        try:
+            from waitress import serve
+            serve(app, host='127.0.0.1', port=5000, threads=8)
+        except ImportError:
+            print("[Server] waitress 미설치 - Flask 서버(threaded)로 실행합니다")
+            app.run(port=5000, threaded=True)
 
@@ -3,40 +3,217 @@ Carte Blanche - Rule Engine
 트리거-액션 매핑 및 규칙 관리
 """
 import json
+import mmap
 import os
-from typing import List, Dict, Optional
+import sys
+import threading
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+
+from src.log import get_logger
+
+# 선택적 고속 JSON 라이브러리 (없으면 표준 json 사용)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = get_logger("engine")
+
+_EMPTY = frozenset()
+
+# 폴더별 트라이 조회 결과 캐시 크기 (감시는 비재귀라 실제로는 감시 폴더 수 정도)
+_DIR_CACHE_MAX = 1024
+
+# 이 크기를 넘는 설정 파일은 mmap으로 읽어 파서에 바로 전달 (작은 파일은 mmap 비용이 더 큼)
+_MMAP_THRESHOLD = 64 * 1024
+
+
+def _read_json(path: str):
+    """JSON 파일 파싱 (큰 파일은 복사 없이 페이지 캐시를 그대로 orjson에 전달)"""
+    with open(path, 'rb') as f:
+        if orjson and os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+        data = f.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def _split_path(path: str) -> List[str]:
+    """경로를 '/' 기준 구성요소 목록으로 분리 (역슬래시/끝 슬래시 정규화)"""
+    path = path.replace('\\', '/').rstrip('/')
+    return path.split('/') if path else []
+
+
+def _compile_rule(rule: Dict) -> Tuple[bool, str, str, frozenset, Dict]:
+    """
+    규칙 하나의 트리거 필드를 매칭용 튜플로 미리 정규화
+    
+    확장자는 frozenset으로 바꿔 O(1) 포함 검사를 하고, 경로/확장자 문자열은
+    intern하여 같은 폴더를 감시하는 규칙끼리 트라이 키를 공유합니다.
+    """
+    trigger = rule.get('trigger', {})
+    return (
+        rule.get('enabled', True),
+        trigger.get('type'),
+        sys.intern(trigger.get('path', '').replace('\\', '/')),
+        frozenset(sys.intern(e.lower()) for e in trigger.get('extensions', [])),
+        rule,
+    )
+
+
+@lru_cache(maxsize=1024)
+def _split_file_path(file_path: str) -> Tuple[str, str]:
+    """파일 경로 -> (폴더, 소문자 확장자). 같은 파일의 연속 이벤트는 캐시에서 반환"""
+    return os.path.dirname(file_path).replace('\\', '/'), os.path.splitext(file_path)[1].lower()
+
+
+class _PathTrieNode:
+    __slots__ = ('children', 'rule_keys')
+    
+    def __init__(self):
+        self.children: Dict[str, '_PathTrieNode'] = {}
+        self.rule_keys: List[int] = []  # 이 경로를 감시하는 규칙 순번
+
+
+class _PathTrie:
+    """
+    trigger.path 구성요소 단위 트라이
+    
+    파일이 속한 폴더 경로를 한 번만 따라 내려가면서 지나치는 노드(=상위 경로)에
+    등록된 규칙을 모읍니다. 규칙 수가 아니라 경로 깊이에 비례합니다.
+    """
+    
+    def __init__(self):
+        self.root = _PathTrieNode()
+    
+    def insert(self, path: str, key: int) -> None:
+        node = self.root
+        for part in _split_path(path):
+            node = node.children.setdefault(sys.intern(part), _PathTrieNode())
+        node.rule_keys.append(key)
+    
+    def match(self, file_dir: str) -> set:
+        """file_dir 또는 그 상위 경로를 감시하는 규칙 순번 집합"""
+        found = set(self.root.rule_keys)
+        node = self.root
+        for part in _split_path(file_dir):
+            node = node.children.get(part)
+            if node is None:
+                break
+            found.update(node.rule_keys)
+        return found
+
+
+class _RuleIndex:
+    """
+    규칙 스냅샷 + 조회용 인덱스 묶음
+    
+    규칙은 목록 내 순번으로 식별합니다 (id가 없거나 중복된 설정 파일도 안전하게 처리).
+    통째로 한 번에 교체되므로 읽기 쪽은 항상 서로 맞는 규칙/인덱스를 보게 됩니다.
+    """
+    
+    def __init__(self, rules: List[Dict]):
+        self.rules = rules
+        # 규칙별 정규화된 트리거 필드 (enabled, event_type, norm_path, ext_set, rule)
+        # 원본 dict에는 파생 필드를 넣지 않음 (저장/API 응답에 섞이지 않도록)
+        self.compiled: List[Tuple[bool, str, str, frozenset, Dict]] = [
+            _compile_rule(rule) for rule in rules
+        ]
+        self.trie = _PathTrie()
+        self.ext_index: Dict[str, set] = {}  # 소문자 확장자 -> 규칙 순번 집합
+        self.any_ext: set = set()  # 확장자 필터가 없는 규칙 순번
+        self.by_event_type: Dict[str, set] = {}  # 트리거 이벤트 타입 -> 규칙 순번 집합
+        self.watched_paths: set = set()  # 활성 규칙이 감시하는 경로 (원본 표기)
+        self._dir_cache: Dict[str, frozenset] = {}  # 폴더 -> 트라이 조회 결과
+        self.by_id: Dict[str, int] = {}  # 규칙 id -> 순번 (중복 id는 첫 규칙)
+        for pos, rule in enumerate(rules):
+            rule_id = rule.get('id')
+            if rule_id is not None:
+                self.by_id.setdefault(rule_id, pos)
+        
+        for pos, (enabled, etype, npath, exts, rule) in enumerate(self.compiled):
+            if not enabled:
+                continue
+            self.trie.insert(npath, pos)
+            self.by_event_type.setdefault(etype, set()).add(pos)
+            path = rule.get('trigger', {}).get('path')
+            if path:
+                self.watched_paths.add(path)
+            
+            if exts:
+                for ext in exts:
+                    self.ext_index.setdefault(ext, set()).add(pos)
+            else:
+                self.any_ext.add(pos)
+
+
+    def path_candidates(self, file_dir: str) -> frozenset:
+        """file_dir에 해당하는 규칙 순번 (트라이 탐색 결과를 폴더별로 캐시)"""
+        found = self._dir_cache.get(file_dir)
+        if found is None:
+            found = frozenset(self.trie.match(file_dir))
+            if len(self._dir_cache) >= _DIR_CACHE_MAX:
+                self._dir_cache.clear()
+            self._dir_cache[file_dir] = found
+        return found
 
 
 class RuleEngine:
+    """
+    규칙 저장소 (Copy-on-Write)
+    
+    self.rules는 한 번 공개되면 수정하지 않는 스냅샷입니다. 변경 작업은 새 목록을
+    만들어 통째로 교체하므로, 읽기 쪽은 잠금 없이 참조만 가져가면 됩니다.
+    """
+    
     def __init__(self, config_path: str):
         self.config_path = config_path
         self.rules: List[Dict] = []
+        self._index = _RuleIndex([])
+        self._write_lock = threading.Lock()  # 쓰기 작업끼리만 직렬화
         self.load_rules()
     
+    def _publish(self, rules: List[Dict]) -> None:
+        """새 규칙 스냅샷을 원자적으로 교체합니다. (조회용 인덱스도 함께 재구성)"""
+        self._index = _RuleIndex(rules)
+        self.rules = rules
+    
     def load_rules(self) -> None:
         """설정 파일에서 규칙을 로드합니다."""
-        try:
-            if os.path.exists(self.config_path):
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    self.rules = config.get('rules', [])
-                print(f"[Engine] {len(self.rules)}개의 규칙 로드됨")
-            else:
-                print(f"[Engine] 설정 파일 없음: {self.config_path}")
-                self.rules = []
-        except Exception as e:
-            print(f"[Engine] 규칙 로드 실패: {e}")
-            self.rules = []
+        # 파일 읽기부터 교체까지 쓰기 잠금 안에서 (동시에 저장 중인 추가/수정/삭제를 덮어쓰지 않도록)
+        with self._write_lock:
+            try:
+                if os.path.exists(self.config_path):
+                    config = _read_json(self.config_path)
+                    self._publish(config.get('rules', []))
+                    logger.info("[Engine] %d개의 규칙 로드됨", len(self.rules))
+                else:
+                    logger.warning("[Engine] 설정 파일 없음: %s", self.config_path)
+                    self._publish([])
+            except Exception as e:
+                logger.error("[Engine] 규칙 로드 실패: %s", e)
+                self._publish([])
     
     def save_rules(self) -> bool:
         """규칙을 설정 파일에 저장합니다."""
         try:
+            if orjson:
+                data = orjson.dumps({"rules": self.rules}, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps({"rules": self.rules}, indent=2, ensure_ascii=False).encode('utf-8')
+            
             os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump({"rules": self.rules}, f, indent=2, ensure_ascii=False)
+            # 임시 파일에 한 번에 쓰고 교체 (저장 도중 종료돼도 기존 설정 보존)
+            tmp_path = self.config_path + '.tmp'
+            with open(tmp_path, 'wb', buffering=0) as f:
+                f.write(data)
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_path)
             return True
         except Exception as e:
-            print(f"[Engine] 규칙 저장 실패: {e}")
+            logger.error("[Engine] 규칙 저장 실패: %s", e)
             return False
     
     def get_all_rules(self) -> List[Dict]:
@@ -45,74 +222,59 @@ class RuleEngine:
     
     def get_rule(self, rule_id: str) -> Optional[Dict]:
         """특정 ID의 규칙을 반환합니다."""
-        for rule in self.rules:
-            if rule.get('id') == rule_id:
-                return rule
-        return None
+        index = self._index
+        pos = index.by_id.get(rule_id)
+        return index.rules[pos] if pos is not None else None
     
     def add_rule(self, rule: Dict) -> bool:
         """새 규칙을 추가합니다."""
-        if not rule.get('id'):
-            rule['id'] = f"rule_{len(self.rules) + 1:03d}"
-        self.rules.append(rule)
-        return self.save_rules()
+        with self._write_lock:
+            if not rule.get('id'):
+                rule['id'] = f"rule_{len(self.rules) + 1:03d}"
+            self._publish(self.rules + [rule])
+            return self.save_rules()
     
     def update_rule(self, rule_id: str, updated_rule: Dict) -> bool:
         """기존 규칙을 업데이트합니다."""
-        for i, rule in enumerate(self.rules):
-            if rule.get('id') == rule_id:
-                updated_rule['id'] = rule_id
-                self.rules[i] = updated_rule
-                return self.save_rules()
-        return False
+        with self._write_lock:
+            i = self._index.by_id.get(rule_id)
+            if i is None:
+                return False
+            updated_rule['id'] = rule_id
+            new_rules = list(self.rules)
+            new_rules[i] = updated_rule
+            self._publish(new_rules)
+            return self.save_rules()
     
     def delete_rule(self, rule_id: str) -> bool:
         """규칙을 삭제합니다."""
-        for i, rule in enumerate(self.rules):
-            if rule.get('id') == rule_id:
-                self.rules.pop(i)
-                return self.save_rules()
-        return False
+        with self._write_lock:
+            i = self._index.by_id.get(rule_id)
+            if i is None:
+                return False
+            self._publish(self.rules[:i] + self.rules[i + 1:])
+            return self.save_rules()
     
     def get_watched_paths(self) -> List[str]:
         """감시해야 할 모든 경로를 반환합니다."""
-        paths = set()
-        for rule in self.rules:
-            if rule.get('enabled', True):
-                trigger = rule.get('trigger', {})
-                path = trigger.get('path')
-                if path:
-                    paths.add(path)
-        return list(paths)
+        return list(self._index.watched_paths)
     
     def find_matching_rules(self, file_path: str, event_type: str = "file_created") -> List[Dict]:
         """
         파일 경로와 이벤트 타입에 매칭되는 규칙들을 찾습니다.
         """
-        matching = []
-        file_ext = os.path.splitext(file_path)[1].lower()
-        file_dir = os.path.dirname(file_path).replace('\\', '/')
-        
-        for rule in self.rules:
-            if not rule.get('enabled', True):
-                continue
-                
-            trigger = rule.get('trigger', {})
-            
-            # 이벤트 타입 확인
-            if trigger.get('type') != event_type:
-                continue
-            
-            # 경로 확인
-            rule_path = trigger.get('path', '').replace('\\', '/')
-            if not file_dir.startswith(rule_path):
-                continue
-            
-            # 확장자 확인
-            extensions = trigger.get('extensions', [])
-            if extensions and file_ext not in extensions:
-                continue
-            
-            matching.append(rule)
+        # 이 이벤트 타입의 활성 규칙이 없으면 경로 문자열 처리 없이 바로 반환
+        index = self._index
+        type_keys = index.by_event_type.get(event_type)
+        if not type_keys:
+            return []
         
-        return matching
+        # 이벤트 타입 ∩ 확장자 ∩ 경로(트라이) 후보를 집합 연산으로만 구함
+        # (결과는 규칙 목록 순서 유지)
+        file_dir, file_ext = _split_file_path(file_path)
+        candidates = type_keys & (index.ext_index.get(file_ext, _EMPTY) | index.any_ext)
+        if not candidates:
+            return []
+        candidates &= index.path_candidates(file_dir)
+        compiled = index.compiled
+        return [compiled[pos][4] for pos in sorted(candidates)]
@@ -0,0 +1,45 @@
+"""
+Carte Blanche - Logging
+큐 기반 로거 설정
+
+호출 스레드(watchdog 콜백 등)는 레코드를 큐에 넣기만 하고,
+포맷팅과 콘솔 출력은 QueueListener 스레드가 처리합니다.
+"""
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+ROOT_LOGGER_NAME = "carte_blanche"
+
+_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+
+_console = logging.StreamHandler()
+_console.setFormatter(logging.Formatter("%(message)s"))
+_listener = QueueListener(_queue, _console, respect_handler_level=True)
+_queue_handler = QueueHandler(_queue)
+
+logger = logging.getLogger(ROOT_LOGGER_NAME)
+logger.setLevel(logging.INFO)
+logger.addHandler(_queue_handler)
+logger.propagate = False  # 루트 로거(basicConfig)로 중복 출력되지 않도록
+
+_listener.start()
+atexit.register(_listener.stop)  # 종료 전 큐에 남은 로그 출력
+
+
+def get_logger(name: str) -> logging.Logger:
+    """carte_blanche 하위 로거 반환 (예: get_logger("engine") -> carte_blanche.engine)"""
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+def use_direct_output():
+    """
+    큐 대신 콘솔 핸들러로 바로 출력 (프로세스 풀 작업자 initializer용)
+    
+    fork된 자식에는 리스너 스레드가 복제되지 않고, 풀 종료 시 작업자는 강제 종료되어
+    큐에 남은 레코드가 사라지므로 작업자 프로세스에서는 동기 출력을 사용합니다.
+    """
+    if _queue_handler in logger.handlers:
+        logger.removeHandler(_queue_handler)
+        logger.addHandler(_console)
@@ -2,19 +2,76 @@
 Carte Blanche - Tool Registry
 재사용 가능한 도구 함수들의 집합
 """
+import mmap
 import os
+import re
+import shutil
 import subprocess
+import sys
+import threading
 import time
 from datetime import datetime
 from typing import Any, Callable
 
-# 선택적 GUI 라이브러리
-try:
-    import pyautogui
-    import pyperclip
-    GUI_AVAILABLE = True
-except ImportError:
-    GUI_AVAILABLE = False
+from src.log import get_logger
+
+logger = get_logger("tools")
+
+
+_WORD_RE = re.compile(r'\S+')
+
+# 사용자 공간 복사 시 버퍼 크기 (shutil 기본 64KB~1MB 대신 고정 1MB)
+_COPY_BUFSIZE = 1 << 20
+
+if sys.platform == 'win32':
+    import ctypes
+    from ctypes import wintypes
+    
+    _CopyFileExW = ctypes.windll.kernel32.CopyFileExW
+    _CopyFileExW.argtypes = [
+        wintypes.LPCWSTR, wintypes.LPCWSTR,
+        ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, wintypes.DWORD,
+    ]
+    _CopyFileExW.restype = wintypes.BOOL
+else:
+    _CopyFileExW = None
+
+# 이미 만들었거나 존재를 확인한 출력 폴더 (매 호출 makedirs의 stat 반복 방지)
+_ensured_dirs: set = set()
+_ensured_lock = threading.Lock()
+
+# 이보다 큰 utf-8 파일은 mmap에서 바로 디코딩 (중간 bytes 버퍼 생략)
+_MMAP_READ_THRESHOLD = 1 << 20
+
+
+def wait_for_window(title_part: str, timeout: float = 3.0, interval: float = 0.05) -> bool:
+    """
+    제목에 title_part가 포함된 창이 나타날 때까지 대기 (고정 sleep 대신 폴링)
+    
+    Args:
+        title_part: 창 제목에 포함될 문자열 (예: 파일명)
+        timeout: 최대 대기 시간 (초)
+        interval: 확인 간격 (초)
+    
+    Returns:
+        창이 감지되면 True, 시간 초과 또는 창 감지가 불가능한 환경이면 False
+    """
+    try:
+        import pygetwindow
+    except Exception:
+        # 창 감지 불가 환경 (pygetwindow 없음/미지원 OS): 기존처럼 고정 대기
+        time.sleep(1)
+        return False
+    
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if pygetwindow.getWindowsWithTitle(title_part):
+                return True
+        except Exception:
+            return False
+        time.sleep(interval)
+    return False
 
 
 class ToolRegistry:
@@ -30,7 +87,7 @@ class ToolRegistry:
             "func": func,
             "description": description
         }
-        print(f"[ToolRegistry] 도구 등록: {name}")
+        logger.debug("[ToolRegistry] 도구 등록: %s", name)
     
     def get(self, name: str) -> Callable:
         """도구 함수 반환"""
@@ -64,6 +121,34 @@ class ToolRegistry:
 
 # ==================== 도구 함수들 ====================
 
+def _ensure_dir(path: str) -> None:
+    """폴더가 없으면 생성 (한 번 확인한 폴더는 다시 확인하지 않음)"""
+    if not path or path in _ensured_dirs:
+        return
+    os.makedirs(path, exist_ok=True)
+    with _ensured_lock:
+        _ensured_dirs.add(path)
+
+
+def _in_output_dir(path: str, write: Callable, *args):
+    """
+    path 폴더에 파일을 쓰는 write(*args) 실행
+    
+    실행 중에 사용자가 폴더를 지우거나 이름을 바꾸면 _ensure_dir 캐시가 틀리게 되므로,
+    폴더가 사라져 FileNotFoundError가 나면 캐시에서 빼고 다시 만든 뒤 한 번 재시도합니다.
+    """
+    _ensure_dir(path)
+    try:
+        return write(*args)
+    except FileNotFoundError:
+        if not path or os.path.isdir(path):
+            raise  # 원본 파일이 없는 등 출력 폴더와 무관한 오류
+        with _ensured_lock:
+            _ensured_dirs.discard(path)
+        _ensure_dir(path)
+        return write(*args)
+
+
 def read_file(path: str, encoding: str = "utf-8") -> dict:
     """
     파일 내용을 읽어서 반환
@@ -76,8 +161,12 @@ def read_file(path: str, encoding: str = "utf-8") -> dict:
         {"success": bool, "result": str or error}
     """
     try:
-        with open(path, 'r', encoding=encoding) as f:
-            content = f.read()
+        if (encoding.lower().replace('_', '-') in ('utf-8', 'utf8')
+                and os.path.getsize(path) > _MMAP_READ_THRESHOLD):
+            content = _read_text_mmap(path)
+        else:
+            with open(path, 'r', encoding=encoding) as f:
+                content = f.read()
         return {
             "success": True,
             "result": content,
@@ -88,6 +177,17 @@ def read_file(path: str, encoding: str = "utf-8") -> dict:
         return {"success": False, "error": str(e)}
 
 
+def _read_text_mmap(path: str) -> str:
+    """큰 utf-8 파일을 mmap으로 열어 페이지 캐시에서 바로 str로 디코딩"""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            content = str(mm, 'utf-8')
+    # 텍스트 모드 open()과 같은 줄바꿈 변환 (\r\n, \r -> \n)
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
 def save_to_output(content: str, output_dir: str, prefix: str = "", 
                    filename: str = None, encoding: str = "utf-8") -> dict:
     """
@@ -104,8 +204,6 @@ def save_to_output(content: str, output_dir: str, prefix: str = "",
         {"success": bool, "result": 저장된 파일 경로}
     """
     try:
-        os.makedirs(output_dir, exist_ok=True)
-        
         if filename is None:
             filename = f"{prefix}{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         else:
@@ -113,8 +211,11 @@ def save_to_output(content: str, output_dir: str, prefix: str = "",
         
         output_path = os.path.join(output_dir, filename)
         
-        with open(output_path, 'w', encoding=encoding) as f:
-            f.write(content)
+        def write():
+            with open(output_path, 'w', encoding=encoding) as f:
+                f.write(content)
+        
+        _in_output_dir(output_dir, write)
         
         return {
             "success": True,
@@ -216,16 +317,15 @@ def copy_file(source: str, destination: str) -> dict:
         {"success": bool, "result": 복사된 파일 경로}
     """
     try:
-        import shutil
-        
         # destination이 디렉토리면 같은 이름으로 복사
         if os.path.isdir(destination):
+            dest_dir = destination
             dest_path = os.path.join(destination, os.path.basename(source))
         else:
             dest_path = destination
-            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            dest_dir = os.path.dirname(dest_path)
         
-        shutil.copy2(source, dest_path)
+        _in_output_dir(dest_dir, _copy_with_metadata, source, dest_path)
         return {
             "success": True,
             "result": dest_path,
@@ -235,6 +335,25 @@ def copy_file(source: str, destination: str) -> dict:
         return {"success": False, "error": str(e)}
 
 
+def _copy_with_metadata(source: str, dest_path: str) -> None:
+    """
+    shutil.copy2와 같은 결과 (내용 + 수정 시각/권한)
+    
+    Windows는 커널 복사(CopyFileExW)를 쓰고, 실패하면 1MB 버퍼로 직접 복사합니다.
+    그 외 OS는 shutil.copy2가 이미 sendfile/fcopyfile을 사용하므로 그대로 둡니다.
+    """
+    if _CopyFileExW is None:
+        shutil.copy2(source, dest_path)
+        return
+    
+    if _CopyFileExW(source, dest_path, None, None, None, 0):
+        return
+    logger.debug("[Tools] CopyFileExW 실패 (%s), 버퍼 복사로 대체", ctypes.WinError())
+    with open(source, 'rb') as src, open(dest_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, _COPY_BUFSIZE)
+    shutil.copystat(source, dest_path)
+
+
 def move_file(source: str, destination: str) -> dict:
     """
     파일 이동
@@ -247,15 +366,14 @@ def move_file(source: str, destination: str) -> dict:
         {"success": bool, "result": 이동된 파일 경로}
     """
     try:
-        import shutil
-        
         if os.path.isdir(destination):
+            dest_dir = destination
             dest_path = os.path.join(destination, os.path.basename(source))
         else:
             dest_path = destination
-            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            dest_dir = os.path.dirname(dest_path)
         
-        shutil.move(source, dest_path)
+        _in_output_dir(dest_dir, shutil.move, source, dest_path)
         return {
             "success": True,
             "result": dest_path,
@@ -276,12 +394,13 @@ def summarize_text(content: str) -> dict:
         {"success": bool, "result": 요약 정보 문자열}
     """
     try:
-        lines = content.split('\n')
-        words = content.split()
+        # 부분 문자열 목록을 만들지 않고 개수만 셈
+        lines = content.count('\n') + 1
+        words = sum(1 for _ in _WORD_RE.finditer(content))
         
         summary = f"""=== 텍스트 요약 ===
-총 줄 수: {len(lines)}
-총 단어 수: {len(words)}
+총 줄 수: {lines}
+총 단어 수: {words}
 총 문자 수: {len(content)}
 처리 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
@@ -292,8 +411,8 @@ def summarize_text(content: str) -> dict:
             "success": True,
             "result": summary,
             "stats": {
-                "lines": len(lines),
-                "words": len(words),
+                "lines": lines,
+                "words": words,
                 "chars": len(content)
             }
         }
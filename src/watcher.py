@@ -5,6 +5,9 @@ watchdog 기반 파일 시스템 감시자
 import os
 import sys
 import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileCreatedEvent
 
@@ -13,19 +16,112 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
 
 from src.engine import RuleEngine
-from src.workers import execute_action
+from src.workers import execute_action, is_gui_action
+from src.log import get_logger
+
+logger = get_logger("watcher")
+
+# 같은 파일의 연속 이벤트를 하나로 합치는 구간 (초)
+DEBOUNCE_WINDOW = 0.5
+# 최근 이벤트 시각을 기억할 최대 파일 수
+RECENT_MAX = 1024
+
+
+def _wait_until_stable(path: str, interval: float = 0.05, timeout: float = 2.0) -> bool:
+    """
+    파일 쓰기가 끝날 때까지 대기
+    
+    interval 간격으로 크기/수정 시각을 확인해 연속 두 번 같으면 완료로 봅니다.
+    timeout 안에 안정되지 않거나 파일이 사라지면 False를 반환합니다.
+    """
+    deadline = time.monotonic() + timeout
+    prev = None
+    while True:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        current = (st.st_size, st.st_mtime_ns)
+        if current == prev:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        prev = current
+        time.sleep(interval)
+
+
+def _run_actions(file_path: str, actions: list):
+    """
+    한 파일에 매칭된 규칙들의 액션을 규칙 순서대로 하나씩 실행
+    
+    같은 파일을 읽는 액션과 옮기는 액션(move_file 등)이 서로 겹치지 않도록 순차 실행합니다.
+    """
+    for rule_name, action_type, output_path, action_args in actions:
+        logger.info("[Watcher] 규칙 적용: %s", rule_name)
+        try:
+            result = execute_action(action_type, file_path, output_path, action_args)
+        except Exception as e:
+            logger.error("[Watcher] 액션 실행 오류: %s", e)
+            continue
+        logger.info("[Watcher] 액션 결과: %s", result)
 
 
 class FileEventHandler(FileSystemEventHandler):
     """파일 생성 및 수정 이벤트를 처리하는 핸들러"""
     
-    def __init__(self, rule_engine: RuleEngine):
+    def __init__(self, rule_engine: RuleEngine, executor: ThreadPoolExecutor = None,
+                 gui_executor: ThreadPoolExecutor = None):
         self.rule_engine = rule_engine
+        self.executor = executor  # 없으면 액션을 현재 스레드에서 바로 실행
+        self.gui_executor = gui_executor  # GUI 액션용 단일 작업자 (화면 조작은 한 번에 하나씩)
+        self._recent: "OrderedDict[str, float]" = OrderedDict()  # 경로 -> 마지막 이벤트 시각
+        self._pending: dict = {}  # 경로 -> 대기 중인 Timer
+        self._lock = threading.Lock()
         super().__init__()
     
+    def _schedule(self, file_path: str, event_type: str):
+        """
+        이벤트 디바운스
+        
+        파일을 쓰는 동안 수정 이벤트가 연달아 들어오므로, 마지막 이벤트 후
+        DEBOUNCE_WINDOW 동안 조용해졌을 때 한 번만 처리합니다.
+        """
+        with self._lock:
+            self._recent[file_path] = time.monotonic()
+            self._recent.move_to_end(file_path)
+            while len(self._recent) > RECENT_MAX:
+                self._recent.popitem(last=False)
+            
+            if file_path in self._pending:
+                return  # 대기 중인 처리가 마지막 이벤트 기준으로 다시 미뤄짐
+            self._start_timer(DEBOUNCE_WINDOW, file_path, event_type)
+    
+    def _start_timer(self, delay: float, file_path: str, event_type: str):
+        timer = threading.Timer(delay, self._fire, (file_path, event_type))
+        timer.daemon = True
+        self._pending[file_path] = timer
+        timer.start()
+    
+    def _fire(self, file_path: str, event_type: str):
+        with self._lock:
+            remaining = self._recent.get(file_path, 0) + DEBOUNCE_WINDOW - time.monotonic()
+            if remaining > 0:
+                # 대기 중에 새 이벤트가 들어옴 -> 남은 시간만큼 다시 대기
+                self._start_timer(remaining, file_path, event_type)
+                return
+            self._pending.pop(file_path, None)
+        self._process_file(file_path, event_type)
+    
+    def cancel_pending(self):
+        """대기 중인 처리 예약을 모두 취소"""
+        with self._lock:
+            for timer in self._pending.values():
+                timer.cancel()
+            self._pending.clear()
+    
     def _process_file(self, file_path: str, event_type: str):
         """파일 처리 공통 로직"""
-        print(f"\n[Watcher] 파일 감지 ({event_type}): {file_path}")
+        logger.info("[Watcher] 파일 감지 (%s): %s", event_type, file_path)
         
         # 매칭되는 규칙 찾기 (file_created와 file_modified 모두 처리)
         matching_rules = self.rule_engine.find_matching_rules(
@@ -34,35 +130,49 @@ class FileEventHandler(FileSystemEventHandler):
         )
         
         if not matching_rules:
-            print(f"[Watcher] 매칭되는 규칙 없음")
+            logger.debug("[Watcher] 매칭되는 규칙 없음")
             return
         
-        # 매칭된 규칙들에 대해 액션 실행
+        # 파일이 완전히 쓰여질 때까지 대기 (규칙마다가 아니라 한 번만)
+        if not _wait_until_stable(file_path):
+            logger.warning("[Watcher] 파일이 안정되지 않음, 그대로 진행: %s", file_path)
+        
+        # 매칭된 규칙들의 액션 (규칙 순서 유지)
+        actions = []
         for rule in matching_rules:
-            print(f"[Watcher] 규칙 적용: {rule.get('name')}")
             action = rule.get('action', {})
             action_type = action.get('type')
-            output_path = action.get('output_path', '')
-            
             if action_type:
-                # 파일이 완전히 쓰여질 때까지 잠시 대기
-                time.sleep(0.5)
-                action_args = action.get('args', {})
-                result = execute_action(action_type, file_path, output_path, args=action_args)
-                print(f"[Watcher] 액션 결과: {result}")
-
+                actions.append((rule.get('name'), action_type,
+                                action.get('output_path', ''), action.get('args', {})))
+        if not actions:
+            return
+        
+        # 파일 하나의 액션들은 한 작업으로 묶어 순서대로 실행하고,
+        # GUI 액션이 섞여 있으면 단일 작업자 executor로 보내 다른 파일의 GUI 작업과 겹치지 않게 함
+        executor = self.executor
+        if self.gui_executor is not None and any(is_gui_action(a[1], a[3]) for a in actions):
+            executor = self.gui_executor
+        if executor is None:
+            _run_actions(file_path, actions)
+            return
+        try:
+            executor.submit(_run_actions, file_path, actions)
+        except RuntimeError:
+            # 감시 중지로 executor가 이미 종료됨
+            logger.warning("[Watcher] 감시 중지됨, 액션 건너뜀: %s", file_path)
     
     def on_created(self, event):
         if event.is_directory:
             return
         file_path = event.src_path.replace('\\', '/')
-        self._process_file(file_path, "생성됨")
+        self._schedule(file_path, "생성됨")
     
     def on_modified(self, event):
         if event.is_directory:
             return
         file_path = event.src_path.replace('\\', '/')
-        self._process_file(file_path, "수정됨")
+        self._schedule(file_path, "수정됨")
 
 
 class FileWatcher:
@@ -74,30 +184,56 @@ class FileWatcher:
         
         self.rule_engine = RuleEngine(config_path)
         self.observer = Observer()
-        self.event_handler = FileEventHandler(self.rule_engine)
+        # 액션은 observer 스레드가 아닌 작업 스레드 풀에서 실행
+        self._executor = None
+        self._gui_executor = None
+        self._make_executors()
+        self.event_handler = FileEventHandler(self.rule_engine, self._executor, self._gui_executor)
+        self._watches: dict = {}  # 경로 -> ObservedWatch
         self._running = False
+        self._ready = threading.Event()  # start() 완료 신호
+    
+    def _make_executors(self):
+        """작업 스레드 풀 생성 (stop()으로 종료되었으면 새로 만듦)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=os.cpu_count() or 4, thread_name_prefix="cb-action"
+            )
+        if self._gui_executor is None:
+            self._gui_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cb-gui")
     
     def start(self):
         """감시 시작"""
+        self._make_executors()
+        self.event_handler.executor = self._executor
+        self.event_handler.gui_executor = self._gui_executor
+        
         paths = self.rule_engine.get_watched_paths()
         
         if not paths:
-            print("[Watcher] 감시할 경로가 없습니다.")
+            logger.warning("[Watcher] 감시할 경로가 없습니다.")
+            self._ready.set()
             return
         
+        self._watches = {}
         for path in paths:
-            # 경로가 없으면 생성
-            if not os.path.exists(path):
-                os.makedirs(path, exist_ok=True)
-                print(f"[Watcher] 폴더 생성됨: {path}")
-            
-            self.observer.schedule(self.event_handler, path, recursive=False)
-            print(f"[Watcher] 감시 시작: {path}")
+            self._watch(path)
         
         self.observer.start()
         self._running = True
-        print("\n[Watcher] === Carte Blanche 파일 감시자 실행 중 ===")
-        print("[Watcher] 종료하려면 Ctrl+C를 누르세요.\n")
+        self._ready.set()
+        logger.info("[Watcher] === Carte Blanche 파일 감시자 실행 중 ===")
+        logger.info("[Watcher] 종료하려면 Ctrl+C를 누르세요.")
+    
+    def _watch(self, path: str):
+        """경로 하나를 Observer에 등록"""
+        # 경로가 없으면 생성
+        if not os.path.exists(path):
+            os.makedirs(path, exist_ok=True)
+            logger.info("[Watcher] 폴더 생성됨: %s", path)
+        
+        self._watches[path] = self.observer.schedule(self.event_handler, path, recursive=False)
+        logger.info("[Watcher] 감시 시작: %s", path)
     
     def stop(self):
         """감시 중지"""
@@ -106,9 +242,18 @@ class FileWatcher:
                 self.observer.stop()
                 self.observer.join(timeout=2)
             except Exception as e:
-                print(f"[Watcher] 중지 중 오류: {e}")
+                logger.error("[Watcher] 중지 중 오류: %s", e)
+            self.event_handler.cancel_pending()
+            # 실행 중인 액션은 끝까지 돌고, 대기 중인 작업만 버림
+            for executor in (self._executor, self._gui_executor):
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._gui_executor = None
             self._running = False
-            print("[Watcher] 감시 중지됨")
+            self._watches = {}
+            self._ready.clear()
+            logger.info("[Watcher] 감시 중지됨")
     
     def is_running(self):
         """실제 Observer 스레드 상태 확인"""
@@ -117,15 +262,32 @@ class FileWatcher:
             return True
         elif self._running and not self.observer.is_alive():
             # 스레드가 죽었으면 플래그 리셋
-            print("[Watcher] ⚠️ Observer 스레드가 예기치 않게 종료됨")
+            logger.warning("[Watcher] ⚠️ Observer 스레드가 예기치 않게 종료됨")
             self._running = False
             return False
         return False
     
     def reload_rules(self):
-        """규칙 다시 로드"""
+        """규칙 다시 로드 (실행 중이면 바뀐 감시 경로만 Observer에 반영)"""
         self.rule_engine.load_rules()
-        print("[Watcher] 규칙 리로드됨")
+        logger.info("[Watcher] 규칙 리로드됨")
+        
+        if not self.is_running():
+            return
+        
+        old = set(self._watches)
+        new = set(self.rule_engine.get_watched_paths())
+        for path in old - new:
+            try:
+                self.observer.unschedule(self._watches.pop(path))
+                logger.info("[Watcher] 감시 해제: %s", path)
+            except Exception as e:
+                logger.error("[Watcher] 감시 해제 실패 (%s): %s", path, e)
+        for path in new - old:
+            try:
+                self._watch(path)
+            except Exception as e:
+                logger.error("[Watcher] 감시 등록 실패 (%s): %s", path, e)
     
     def restart(self):
         """감시 재시작"""
@@ -156,4 +318,4 @@ if __name__ == "__main__":
             time.sleep(1)
     except KeyboardInterrupt:
         watcher.stop()
-        print("\n[Watcher] 프로그램 종료")
+        logger.info("[Watcher] 프로그램 종료")
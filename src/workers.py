@@ -3,7 +3,169 @@ Carte Blanche - Workers Module
 파일 타입별 처리 함수들
 """
 import os
-from datetime import datetime
+import re
+import mmap
+import inspect
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+
+from src.log import get_logger, use_direct_output
+# 출력 폴더 생성 여부를 프로세스 단위로 기억 (도구 함수들과 같은 캐시 공유, 폴더가 지워지면 다시 생성)
+from src.tools import _in_output_dir
+
+logger = get_logger("workers")
+
+_WORD_RE = re.compile(r'\S+')
+
+# process_txt 읽기 버퍼 크기 (문자 수)
+_READ_CHUNK = 1 << 20
+
+# 엑셀 미리보기 백엔드 (기본 openpyxl)
+# python-calamine(Rust 기반)은 훨씬 빠르지만 수식 셀을 수식 대신 저장된 값으로 읽는 등
+# 미리보기 내용이 달라질 수 있으므로 CB_XLSX_BACKEND=calamine 으로 지정했을 때만 사용
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+_XLSX_BACKEND = os.environ.get('CB_XLSX_BACKEND', 'openpyxl')
+
+
+def _scan_text(file_path: str) -> tuple:
+    """
+    파일 전체를 메모리에 올리지 않고 고정 크기 버퍼로 한 번만 훑으며 집계
+    
+    Returns:
+        (줄 수, 단어 수, 문자 수, 미리보기용 앞부분 최대 201자)
+    """
+    line_count = 1
+    word_count = 0
+    char_count = 0
+    head = ""
+    prev_in_word = False  # 이전 버퍼가 단어 중간에서 끝났는지
+    
+    with open(file_path, 'r', encoding='utf-8', buffering=_READ_CHUNK) as f:
+        while True:
+            chunk = f.read(_READ_CHUNK)
+            if not chunk:
+                break
+            char_count += len(chunk)
+            line_count += chunk.count('\n')
+            word_count += sum(1 for _ in _WORD_RE.finditer(chunk))
+            if prev_in_word and not chunk[0].isspace():
+                word_count -= 1  # 버퍼 경계에 걸친 단어는 한 번만 셈
+            prev_in_word = not chunk[-1].isspace()
+            if len(head) <= 200:
+                head += chunk[:201 - len(head)]
+    
+    return line_count, word_count, char_count, head
+
+
+# 이보다 큰 텍스트 파일은 (numba가 설치되어 있으면) JIT 컴파일된 바이트 스캐너로 집계
+_JIT_THRESHOLD = 1 << 20
+
+
+@lru_cache(maxsize=1)
+def _stats_kernel():
+    """
+    UTF-8 바이트 배열 -> (줄 수, 단어 수, 문자 수, 올바른 UTF-8인지) numba 커널
+    
+    numba/numpy 임포트와 컴파일이 무거우므로 처음 큰 파일을 만났을 때 한 번만 준비합니다.
+    텍스트 모드 읽기와 같은 결과가 나오도록 \r\n, \r 을 줄바꿈 한 글자로 세고,
+    str.isspace()와 같은 유니코드 공백 기준으로 단어를 나눕니다.
+    잘못된 UTF-8 시퀀스를 만나면 네 번째 값을 False로 돌려주고 바로 멈춥니다.
+    
+    Returns:
+        컴파일된 커널, numba가 없으면 None
+    """
+    try:
+        import numba
+        import numpy as np
+    except ImportError:
+        return None
+    
+    @numba.njit(cache=True)
+    def is_space(cp):
+        if cp <= 0x20:
+            return cp == 0x20 or 0x09 <= cp <= 0x0D or 0x1C <= cp <= 0x1F
+        if cp < 0x85:
+            return False
+        return (cp == 0x85 or cp == 0xA0 or cp == 0x1680 or 0x2000 <= cp <= 0x200A
+                or cp == 0x2028 or cp == 0x2029 or cp == 0x202F or cp == 0x205F
+                or cp == 0x3000)
+    
+    @numba.njit(cache=True)
+    def is_cont(buf, j, n):
+        return j < n and (buf[j] & 0xC0) == 0x80
+    
+    @numba.njit(cache=True)
+    def count_stats(buf):
+        n = buf.shape[0]
+        lines = 1
+        words = 0
+        chars = 0
+        in_word = False
+        i = 0
+        while i < n:
+            b = buf[i]
+            # UTF-8 코드 포인트 하나 디코딩 (파이썬 utf-8 디코더와 같은 기준으로 검사:
+            # 잘린 시퀀스, 과잉 표현, 서로게이트, U+10FFFF 초과는 오류)
+            if b < 0x80:
+                cp = np.int64(b)
+                i += 1
+            elif 0xC2 <= b < 0xE0:
+                if not is_cont(buf, i + 1, n):
+                    return lines, words, chars, False
+                cp = (np.int64(b & 0x1F) << 6) | (buf[i + 1] & 0x3F)
+                i += 2
+            elif 0xE0 <= b < 0xF0:
+                if not (is_cont(buf, i + 1, n) and is_cont(buf, i + 2, n)):
+                    return lines, words, chars, False
+                cp = (np.int64(b & 0x0F) << 12) | (np.int64(buf[i + 1] & 0x3F) << 6) | (buf[i + 2] & 0x3F)
+                if cp < 0x800 or 0xD800 <= cp <= 0xDFFF:
+                    return lines, words, chars, False
+                i += 3
+            elif 0xF0 <= b < 0xF5:
+                if not (is_cont(buf, i + 1, n) and is_cont(buf, i + 2, n) and is_cont(buf, i + 3, n)):
+                    return lines, words, chars, False
+                cp = ((np.int64(b & 0x07) << 18) | (np.int64(buf[i + 1] & 0x3F) << 12)
+                      | (np.int64(buf[i + 2] & 0x3F) << 6) | (buf[i + 3] & 0x3F))
+                if cp < 0x10000 or cp > 0x10FFFF:
+                    return lines, words, chars, False
+                i += 4
+            else:
+                # 연속 바이트로 시작하거나 사용하지 않는 선두 바이트 (0x80-0xC1, 0xF5-0xFF)
+                return lines, words, chars, False
+            
+            if cp == 0x0D:
+                # \r\n, \r -> \n (텍스트 모드 줄바꿈 변환과 동일)
+                if i < n and buf[i] == 0x0A:
+                    i += 1
+                cp = np.int64(0x0A)
+            
+            chars += 1
+            if cp == 0x0A:
+                lines += 1
+            if is_space(cp):
+                in_word = False
+            elif not in_word:
+                words += 1
+                in_word = True
+        return lines, words, chars, True
+    
+    return count_stats
+
+
+def _kernel_stats(kernel, raw) -> tuple:
+    """바이트 버퍼를 복사 없이 uint8 배열로 감싸 커널에 전달"""
+    import numpy as np
+    return kernel(np.frombuffer(raw, dtype=np.uint8))
+
+
+def _decode_head(raw) -> str:
+    """바이트 버퍼 앞부분을 미리보기용 문자열로 (최대 201자, 텍스트 모드와 같은 줄바꿈)"""
+    head = bytes(raw[:2048]).decode('utf-8', errors='ignore')
+    return head.replace('\r\n', '\n').replace('\r', '\n')[:201]
 
 
 def process_txt(file_path: str, output_path: str) -> dict:
@@ -18,104 +180,193 @@ def process_txt(file_path: str, output_path: str) -> dict:
         처리 결과 딕셔너리
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        kernel = _stats_kernel() if os.path.getsize(file_path) > _JIT_THRESHOLD else None
+        stats = None
+        if kernel is not None:
+            # 큰 파일은 mmap으로 페이지 캐시를 그대로 스캔 (파일 크기만큼의 bytes 복사 없음)
+            with open(file_path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    line_count, word_count, char_count, valid = _kernel_stats(kernel, mm)
+                    if valid:
+                        stats = (line_count, word_count, char_count, _decode_head(mm))
+        if stats is None:
+            # 작은 파일, numba 미설치, 잘못된 UTF-8 (텍스트 모드 읽기와 같은 UnicodeDecodeError 발생)
+            stats = _scan_text(file_path)
+        line_count, word_count, char_count, head = stats
         
         # 간단한 요약 정보 생성
-        lines = content.split('\n')
-        words = content.split()
-        
         summary = {
             "original_file": file_path,
-            "total_lines": len(lines),
-            "total_words": len(words),
-            "total_chars": len(content),
-            "preview": content[:200] + "..." if len(content) > 200 else content,
+            "total_lines": line_count,
+            "total_words": word_count,
+            "total_chars": char_count,
+            "preview": head[:200] + "..." if char_count > 200 else head,
             "processed_at": datetime.now().isoformat()
         }
         
         # 결과를 출력 폴더에 저장
-        os.makedirs(output_path, exist_ok=True)
         output_file = os.path.join(
             output_path, 
             f"summary_{os.path.basename(file_path)}"
         )
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(f"=== 파일 요약 ===\n")
-            f.write(f"원본 파일: {summary['original_file']}\n")
-            f.write(f"총 라인 수: {summary['total_lines']}\n")
-            f.write(f"총 단어 수: {summary['total_words']}\n")
-            f.write(f"총 문자 수: {summary['total_chars']}\n")
-            f.write(f"처리 시간: {summary['processed_at']}\n")
-            f.write(f"\n=== 미리보기 ===\n")
-            f.write(summary['preview'])
+        body = (
+            f"=== 파일 요약 ===\n"
+            f"원본 파일: {summary['original_file']}\n"
+            f"총 라인 수: {summary['total_lines']}\n"
+            f"총 단어 수: {summary['total_words']}\n"
+            f"총 문자 수: {summary['total_chars']}\n"
+            f"처리 시간: {summary['processed_at']}\n"
+            f"\n=== 미리보기 ===\n"
+            f"{summary['preview']}"
+        )
+        _in_output_dir(output_path, Path(output_file).write_text, body, 'utf-8')
         
-        print(f"[TXT] 처리 완료: {file_path} -> {output_file}")
+        logger.info("[TXT] 처리 완료: %s -> %s", file_path, output_file)
         return {"success": True, "output": output_file, "summary": summary}
         
     except Exception as e:
-        print(f"[TXT] 처리 실패: {file_path} - {str(e)}")
+        logger.error("[TXT] 처리 실패: %s - %s", file_path, e)
         return {"success": False, "error": str(e)}
 
 
-def process_xlsx(file_path: str, output_path: str) -> dict:
+def _read_xlsx_preview_openpyxl(file_path: str, max_row: int, max_col: int) -> tuple:
+    """openpyxl로 활성 시트의 앞부분을 읽음 -> (시트 이름, 행 목록)"""
+    from openpyxl import load_workbook
+    
+    wb = load_workbook(file_path, read_only=True)
+    try:
+        sheet = wb.active
+        data = [
+            ["" if v is None else str(v) for v in row]
+            for row in sheet.iter_rows(max_row=max_row, max_col=max_col, values_only=True)
+        ]
+        return sheet.title, data
+    finally:
+        wb.close()
+
+
+_ACTIVE_TAB_RE = re.compile(rb'<(?:\w+:)?workbookView\b[^>]*?\bactiveTab="(\d+)"')
+
+
+def _xlsx_active_tab(file_path: str) -> int:
+    """workbook.xml의 activeTab (openpyxl의 wb.active 위치, 없으면 0)"""
+    import zipfile
+    
+    with zipfile.ZipFile(file_path) as zf:
+        m = _ACTIVE_TAB_RE.search(zf.read("xl/workbook.xml"))
+    return int(m.group(1)) if m else 0
+
+
+def _calamine_cell_str(v) -> str:
+    """calamine 셀 값을 openpyxl 미리보기에 가까운 문자열로 변환"""
+    if isinstance(v, float) and v.is_integer() and abs(v) < 1e16:
+        # calamine은 숫자를 모두 float로 주므로 정수 값은 openpyxl처럼 정수로 표시
+        # (float로 정확히 표현되는 범위만, 그 밖은 float 표기 유지)
+        return str(int(v))
+    if isinstance(v, date) and not isinstance(v, datetime):
+        # 날짜만 있는 셀도 openpyxl은 datetime으로 읽음 (2024-01-02 00:00:00)
+        return str(datetime(v.year, v.month, v.day))
+    return str(v)
+
+
+def _read_xlsx_preview_calamine(file_path: str, max_row: int, max_col: int) -> tuple:
+    """
+    python-calamine으로 활성 시트의 앞부분을 읽음 -> (시트 이름, 행 목록)
+    
+    활성 시트가 첫 시트가 아니면 openpyxl로 읽습니다 (calamine은 활성 시트 정보를 주지 않음).
+    수식 셀은 수식 대신 파일에 저장된 계산 값으로 읽히므로 openpyxl 결과와 다를 수 있습니다.
+    """
+    if _xlsx_active_tab(file_path) != 0:
+        return _read_xlsx_preview_openpyxl(file_path, max_row, max_col)
+    
+    wb = python_calamine.CalamineWorkbook.from_path(file_path)
+    try:
+        sheet = wb.get_sheet_by_index(0)
+        data = []
+        # 앞쪽 빈 행/열도 openpyxl처럼 A1부터 그대로 유지
+        for row in sheet.to_python(skip_empty_area=False, nrows=max_row):
+            cells = [_calamine_cell_str(v) for v in row[:max_col]]
+            cells.extend([""] * (max_col - len(cells)))
+            data.append(cells)
+        return sheet.name, data
+    finally:
+        wb.close()
+
+
+@lru_cache(maxsize=32)
+def _read_xlsx_preview_cached(file_path: str, mtime_ns: int, size: int, use_calamine: bool) -> tuple:
+    """
+    엑셀 미리보기 캐시 (감시자가 같은 파일로 여러 번 트리거될 때 zip/XML 재파싱 방지)
+    
+    수정 시각과 크기가 키에 포함되어 파일이 바뀌면 다시 읽습니다.
+    통합 문서 객체 대신 추출한 값만 보관하므로 파일 핸들을 잡아 두지 않습니다.
+    
+    Returns:
+        (시트 이름, 행 튜플들의 튜플)
+    """
+    if use_calamine:
+        sheet_name, data = _read_xlsx_preview_calamine(file_path, 10, 10)
+    else:
+        sheet_name, data = _read_xlsx_preview_openpyxl(file_path, 10, 10)
+    return sheet_name, tuple(tuple(row) for row in data)
+
+
+def process_xlsx(file_path: str, output_path: str, backend: str = None) -> dict:
     """
     엑셀 파일에서 데이터를 읽어옵니다.
     
     Args:
         file_path: 처리할 파일 경로
         output_path: 결과 저장 경로
+        backend: "calamine" 또는 "openpyxl" (기본: CB_XLSX_BACKEND 환경 변수, 없으면 openpyxl)
     
     Returns:
         처리 결과 딕셔너리
     """
     try:
-        from openpyxl import load_workbook
-        
-        wb = load_workbook(file_path, read_only=True)
-        sheet = wb.active
-        
-        # 데이터 읽기 (최대 10행, 10열)
-        data = []
-        for row_idx, row in enumerate(sheet.iter_rows(max_row=10, max_col=10), 1):
-            row_data = []
-            for cell in row:
-                row_data.append(str(cell.value) if cell.value is not None else "")
-            data.append(row_data)
+        # 데이터 읽기 (최대 10행, 10열) - 같은 파일이 바뀌지 않았으면 캐시 사용
+        use_calamine = (backend or _XLSX_BACKEND) == "calamine" and python_calamine is not None
+        st = os.stat(file_path)
+        sheet_name, rows = _read_xlsx_preview_cached(
+            file_path, st.st_mtime_ns, st.st_size, use_calamine
+        )
+        data = [list(row) for row in rows]
         
         result = {
             "original_file": file_path,
-            "sheet_name": sheet.title,
+            "sheet_name": sheet_name,
             "rows_read": len(data),
             "data_preview": data,
             "processed_at": datetime.now().isoformat()
         }
         
-        wb.close()
-        
         # 결과를 출력 폴더에 저장
-        os.makedirs(output_path, exist_ok=True)
         output_file = os.path.join(
             output_path,
             f"extract_{os.path.splitext(os.path.basename(file_path))[0]}.txt"
         )
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(f"=== 엑셀 데이터 추출 ===\n")
-            f.write(f"원본 파일: {result['original_file']}\n")
-            f.write(f"시트 이름: {result['sheet_name']}\n")
-            f.write(f"읽은 행 수: {result['rows_read']}\n")
-            f.write(f"처리 시간: {result['processed_at']}\n")
-            f.write(f"\n=== 데이터 미리보기 ===\n")
-            for row in data:
-                f.write(" | ".join(row) + "\n")
+        rows_str = "".join(" | ".join(row) + "\n" for row in data)
+        body = (
+            f"=== 엑셀 데이터 추출 ===\n"
+            f"원본 파일: {result['original_file']}\n"
+            f"시트 이름: {result['sheet_name']}\n"
+            f"읽은 행 수: {result['rows_read']}\n"
+            f"처리 시간: {result['processed_at']}\n"
+            f"\n=== 데이터 미리보기 ===\n"
+            f"{rows_str}"
+        )
+        # 한 번에 인코딩해서 바이너리로 기록 (텍스트 모드와 같은 OS 줄바꿈 유지)
+        if os.linesep != "\n":
+            body = body.replace("\n", os.linesep)
+        _in_output_dir(output_path, Path(output_file).write_bytes, body.encode('utf-8'))
         
-        print(f"[XLSX] 처리 완료: {file_path} -> {output_file}")
+        logger.info("[XLSX] 처리 완료: %s -> %s", file_path, output_file)
         return {"success": True, "output": output_file, "data": result}
         
     except Exception as e:
-        print(f"[XLSX] 처리 실패: {file_path} - {str(e)}")
+        logger.error("[XLSX] 처리 실패: %s - %s", file_path, e)
         return {"success": False, "error": str(e)}
 
 
@@ -129,55 +380,176 @@ ACTION_HANDLERS = {
 try:
     from src.actions import process_output_and_open_notepad
     ACTION_HANDLERS["open_in_notepad"] = process_output_and_open_notepad
-    print("[Workers] GUI 액션 로드됨: open_in_notepad")
+    logger.debug("[Workers] GUI 액션 로드됨: open_in_notepad")
 except ImportError as e:
-    print(f"[Workers] GUI 액션 로드 실패 (pyautogui/pyperclip 필요): {e}")
+    logger.warning("[Workers] GUI 액션 로드 실패 (pyautogui 필요): %s", e)
 
 # 워크플로우 액션 추가
 try:
-    from src.workflow_engine import run_workflow_for_file
-    import os
+    from src.workflow_engine import _load_workflow_cached, run_workflow_for_file
     
-    def execute_workflow(file_path: str, output_path: str, args: dict = None) -> dict:
-        """워크플로우 JSON 실행"""
-        PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    _PROJECT_ROOT = Path(__file__).resolve().parent.parent
+    # 신규 workflows 폴더에서 먼저 찾고, 없으면 구버전 config 폴더에서 찾음
+    _WORKFLOW_DIRS = (
+        _PROJECT_ROOT / "config" / "workflows",
+        _PROJECT_ROOT / "config",
+    )
+    _WORKFLOW_PATHS: dict = {}  # 워크플로우 파일명 -> 찾은 경로
+    
+    def _find_workflow(workflow_name: str):
+        """
+        워크플로우 파일 경로 (workflows 폴더에서 찾은 경로는 파일이 남아 있는 동안 재사용)
         
-        # 규칙에서 지정한 워크플로우 이름이 있으면 사용, 없으면 기본값
+        구버전 config 폴더에서 찾은 경로는 캐시하지 않습니다.
+        나중에 workflows 폴더에 같은 이름의 파일이 생기면 그쪽이 우선이기 때문입니다.
+        """
+        cached = _WORKFLOW_PATHS.get(workflow_name)
+        if cached is not None and cached.is_file():
+            return cached
+        _WORKFLOW_PATHS.pop(workflow_name, None)
+        for workflow_dir in _WORKFLOW_DIRS:
+            candidate = workflow_dir / workflow_name
+            if candidate.is_file():
+                if workflow_dir == _WORKFLOW_DIRS[0]:
+                    _WORKFLOW_PATHS[workflow_name] = candidate
+                return candidate
+        return None
+    
+    def _workflow_file_name(args: dict = None) -> str:
+        """규칙에서 지정한 워크플로우 파일명 (없으면 기본값, 확장자 보정)"""
         workflow_name = (args or {}).get("workflow_name", "workflow.json")
         if not workflow_name.endswith(".json"):
             workflow_name += ".json"
-            
-        # 신규 workflows 폴더에서 먼저 찾고, 없으면 구버전 config 폴더에서 찾음
-        workflow_path = os.path.join(PROJECT_ROOT, "config", "workflows", workflow_name)
-        if not os.path.exists(workflow_path):
-            workflow_path = os.path.join(PROJECT_ROOT, "config", workflow_name)
+        return workflow_name
+    
+    def execute_workflow(file_path: str, output_path: str, args: dict = None) -> dict:
+        """워크플로우 JSON 실행"""
+        workflow_name = _workflow_file_name(args)
         
-        if not os.path.exists(workflow_path):
-            return {"success": False, "error": f"Workflow '{workflow_name}' not found at {workflow_path}"}
+        workflow_path = _find_workflow(workflow_name)
+        if workflow_path is None:
+            return {"success": False, "error": f"Workflow '{workflow_name}' not found at {_WORKFLOW_DIRS[-1] / workflow_name}"}
         
-        return run_workflow_for_file(workflow_path, file_path, output_path=output_path)
+        return run_workflow_for_file(str(workflow_path), file_path, output_path=output_path)
     
     ACTION_HANDLERS["run_workflow"] = execute_workflow
-    print("[Workers] 워크플로우 액션 로드됨: run_workflow")
+    logger.debug("[Workers] 워크플로우 액션 로드됨: run_workflow")
 except ImportError as e:
-    print(f"[Workers] 워크플로우 액션 로드 실패: {e}")
+    logger.warning("[Workers] 워크플로우 액션 로드 실패: %s", e)
+
 
 
+# 액션 타입 -> 핸들러가 args 인자를 받는지 여부 (시그니처는 타입별로 한 번만 확인)
+_HANDLER_ACCEPTS_ARGS: dict = {}
+
+
+def handler_accepts_args(action_type: str, handler) -> bool:
+    """핸들러가 args 키워드 인자를 받을 수 있는지 확인 (run_workflow 등)"""
+    accepts = _HANDLER_ACCEPTS_ARGS.get(action_type)
+    if accepts is None:
+        params = inspect.signature(handler).parameters
+        accepts = 'args' in params or any(
+            p.kind is inspect.Parameter.VAR_KEYWORD for p in params.values()
+        )
+        _HANDLER_ACCEPTS_ARGS[action_type] = accepts
+    return accepts
+
+
+def _bind_handler(action_type: str, handler):
+    """핸들러를 (file_path, output_path, args) 호출 형태로 고정 (args 지원 여부는 여기서 한 번만 확인)"""
+    if handler_accepts_args(action_type, handler):
+        return lambda file_path, output_path, args, _h=handler: _h(file_path, output_path, args=args)
+    return lambda file_path, output_path, args, _h=handler: _h(file_path, output_path)
+
+
+# 액션 타입 -> 바로 호출할 수 있는 실행 함수 (모듈 로드 시 한 번 구성)
+DISPATCH: dict = {
+    action_type: _bind_handler(action_type, handler)
+    for action_type, handler in ACTION_HANDLERS.items()
+}
+
 
 def execute_action(action_type: str, file_path: str, output_path: str, args: dict = None) -> dict:
     """
     액션 타입에 따라 적절한 처리 함수를 실행합니다.
     """
-    handler = ACTION_HANDLERS.get(action_type)
-    if handler:
-        # 핸들러가 args를 받을 수 있는지 확인 (run_workflow 등)
-        try:
-            return handler(file_path, output_path, args=args)
-        except TypeError:
-            # 기존 핸들러는 args를 받지 않을 수도 있으므로 예외 처리
-            return handler(file_path, output_path)
-    else:
-        return {"success": False, "error": f"Unknown action type: {action_type}"}
+    fn = DISPATCH.get(action_type)
+    if fn is None:
+        # 로드 이후 ACTION_HANDLERS에 추가된 핸들러는 처음 호출할 때 표에 등록
+        handler = ACTION_HANDLERS.get(action_type)
+        if handler is None:
+            return {"success": False, "error": f"Unknown action type: {action_type}"}
+        fn = DISPATCH[action_type] = _bind_handler(action_type, handler)
+    return fn(file_path, output_path, args)
+
+
+# 화면(GUI)을 조작하는 액션 - 자식 프로세스에서 실행하지 않고 현재 프로세스에서 순서대로 실행
+GUI_ACTIONS = frozenset({"open_in_notepad"})
+# 워크플로우 안에서 화면을 조작하는 도구 (하나라도 있으면 그 워크플로우 액션도 GUI로 취급)
+GUI_TOOLS = frozenset({"open_notepad", "open_excel", "open_browser"})
+
+
+def is_gui_action(action_type: str, args: dict = None) -> bool:
+    """
+    화면 포커스를 차지하는 액션인지 (일괄 처리에서 병렬 실행하면 안 되는 액션)
+    
+    run_workflow는 실행할 워크플로우 JSON의 도구 목록으로 판단합니다.
+    """
+    if action_type in GUI_ACTIONS:
+        return True
+    if action_type != "run_workflow" or "run_workflow" not in ACTION_HANDLERS:
+        return False
+    workflow_path = _find_workflow(_workflow_file_name(args))
+    if workflow_path is None:
+        return False
+    try:
+        workflow = _load_workflow_cached(str(workflow_path), workflow_path.stat().st_mtime_ns)
+    except (OSError, ValueError):
+        return False
+    return any(action.get("tool") in GUI_TOOLS for action in workflow.get("actions", []))
+
+# 작업이 이보다 적으면 프로세스 풀 생성 비용이 더 크므로 그냥 순차 실행
+_BULK_MIN_JOBS = 4
 
 
+def _bulk_entry(job: tuple) -> tuple:
+    """프로세스 풀 작업 진입점: (순번, (action_type, file_path, output_path, args)) -> (순번, 결과)"""
+    idx, (action_type, file_path, output_path, args) = job
+    try:
+        return idx, execute_action(action_type, file_path, output_path, args)
+    except Exception as e:
+        return idx, {"success": False, "error": str(e)}
 
+
+def execute_actions_bulk(jobs: list, processes: int = None) -> list:
+    """
+    여러 파일을 프로세스 풀로 나눠 처리 (CPU 위주의 txt/xlsx 처리를 코어 수만큼 병렬화)
+    
+    Args:
+        jobs: (action_type, file_path, output_path, args) 튜플 목록
+        processes: 프로세스 수 (기본: CPU 코어 수)
+    
+    Returns:
+        jobs와 같은 순서의 결과 딕셔너리 목록
+    """
+    import multiprocessing
+    
+    results = [None] * len(jobs)
+    pool_jobs = []
+    for idx, job in enumerate(jobs):
+        if is_gui_action(job[0], job[3]):
+            results[idx] = _bulk_entry((idx, job))[1]
+        else:
+            pool_jobs.append((idx, job))
+    
+    if len(pool_jobs) < _BULK_MIN_JOBS:
+        for job in pool_jobs:
+            idx, result = _bulk_entry(job)
+            results[idx] = result
+        return results
+    
+    processes = min(processes or os.cpu_count() or 1, len(pool_jobs))
+    with multiprocessing.Pool(processes, initializer=use_direct_output) as pool:
+        for idx, result in pool.imap_unordered(_bulk_entry, pool_jobs, chunksize=8):
+            results[idx] = result
+    return results
@@ -4,11 +4,131 @@ JSON 워크플로우 설정을 읽고 동적으로 도구를 실행하는 엔진
 """
 import os
 import re
+import copy
 import json
-from typing import Any
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Any, NamedTuple
 from datetime import datetime
 
 from src.tools import tool_registry
+from src.log import get_logger
+
+logger = get_logger("workflow")
+
+# 선택적 고속 JSON 라이브러리 (없으면 표준 json 사용)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 인자 안의 {variable} 참조
+_VAR_RE = re.compile(r'\{([^}]+)\}')
+
+
+@lru_cache(maxsize=64)
+def _load_workflow_cached(path: str, mtime_ns: int) -> dict:
+    """
+    워크플로우 JSON 파싱 결과 캐시
+    
+    수정 시각이 키에 포함되어 파일이 바뀌면 다시 읽습니다.
+    반환된 dict는 여러 실행이 공유하므로 읽기 전용으로만 사용해야 합니다.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def _iter_var_refs(value):
+    """인자(중첩 dict 포함) 안의 모든 {variable} 이름"""
+    if isinstance(value, str):
+        yield from _VAR_RE.findall(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _iter_var_refs(item)
+
+
+# 컴파일된 인자 항목 종류
+_CONST = 0  # 변수 없는 값 (그대로 전달)
+_VAR = 1    # 값 전체가 변수 하나 (타입 유지)
+_TMPL = 2   # 문자열 안에 변수가 섞임 (문자열로 치환)
+_DICT = 3   # 중첩 딕셔너리
+_COPY = 4   # 변수 없는 list/dict (캐시된 템플릿을 도구가 바꾸지 못하도록 실행마다 복사)
+
+
+def _compile_args(args: dict) -> tuple:
+    """
+    인자 템플릿을 (key, 종류, 값) 목록으로 미리 분석
+    
+    실행할 때는 템플릿 문자열을 다시 스캔하지 않고 컨텍스트 값만 끼워 넣습니다.
+    """
+    compiled = []
+    for key, value in args.items():
+        if isinstance(value, str):
+            whole = _VAR_RE.fullmatch(value)
+            if whole:
+                compiled.append((key, _VAR, whole.group(1)))
+                continue
+            parts = []  # (앞 문자열, 변수 이름, 원문 placeholder)
+            pos = 0
+            for m in _VAR_RE.finditer(value):
+                parts.append((value[pos:m.start()], m.group(1), m.group(0)))
+                pos = m.end()
+            if parts:
+                compiled.append((key, _TMPL, (tuple(parts), value[pos:])))
+            else:
+                compiled.append((key, _CONST, value))
+        elif isinstance(value, dict):
+            nested = _compile_args(value)
+            if all(kind in (_CONST, _COPY) for _, kind, _ in nested):
+                # 변수가 없는 하위 dict는 치환 없이 복사본만 전달
+                compiled.append((key, _COPY, value))
+            else:
+                compiled.append((key, _DICT, nested))
+        elif isinstance(value, list):
+            compiled.append((key, _COPY, value))
+        else:
+            compiled.append((key, _CONST, value))
+    return tuple(compiled)
+
+
+class CompiledAction(NamedTuple):
+    """실행 계획의 한 단계 (워크플로우 JSON의 액션을 미리 분석한 결과)"""
+    step_id: str
+    tool: str
+    description: str
+    args: tuple          # _compile_args 결과
+    refs: frozenset      # 인자가 참조하는 변수 이름
+    stop_on_fail: bool
+    static_args: dict    # 변수도 list/dict 값도 없으면 원본 인자 dict (치환 생략), 아니면 None
+
+
+def _compile_plan(workflow: dict) -> tuple:
+    """워크플로우의 액션 목록을 실행 계획으로 변환"""
+    plan = []
+    for i, action in enumerate(workflow.get("actions", []), 1):
+        args = action.get("args", {})
+        refs = frozenset(_iter_var_refs(args))
+        compiled = _compile_args(args)
+        # 값이 모두 변경 불가능한 상수일 때만 원본 dict를 그대로 넘김 (**kwargs로 풀리므로 최상위는 공유되지 않음)
+        static = not refs and all(kind == _CONST for _, kind, _ in compiled)
+        plan.append(CompiledAction(
+            step_id=action.get("id", f"step{i}"),
+            tool=action.get("tool"),
+            description=action.get("description", ""),
+            args=compiled,
+            refs=refs,
+            stop_on_fail=action.get("stop_on_fail", True),
+            static_args=args if static else None,
+        ))
+    return tuple(plan)
+
+
+@lru_cache(maxsize=64)
+def _load_plan_cached(path: str, mtime_ns: int) -> tuple:
+    """워크플로우 파일별 실행 계획 캐시 (파싱 결과 캐시와 같은 키)"""
+    return _compile_plan(_load_workflow_cached(path, mtime_ns))
 
 
 class WorkflowEngine:
@@ -17,16 +137,21 @@ class WorkflowEngine:
     def __init__(self, workflow_path: str = None):
         self.workflow_path = workflow_path
         self.workflow = None
+        self._plan = None  # 미리 분석한 실행 계획
+        self._plan_for = None  # _plan을 만든 워크플로우 (직접 교체된 경우 감지)
         self.context = {}  # 각 단계 결과를 저장하는 컨텍스트
+        self._context_lock = threading.Lock()  # 병렬 실행 시 컨텍스트 보호
         
         if workflow_path:
             self.load_workflow(workflow_path)
     
     def load_workflow(self, path: str) -> dict:
         """워크플로우 JSON 로드"""
-        with open(path, 'r', encoding='utf-8') as f:
-            self.workflow = json.load(f)
-        print(f"[WorkflowEngine] 워크플로우 로드: {self.workflow.get('workflow_name', 'Unknown')}")
+        mtime_ns = os.stat(path).st_mtime_ns
+        self.workflow = _load_workflow_cached(path, mtime_ns)
+        self._plan = _load_plan_cached(path, mtime_ns)
+        self._plan_for = self.workflow
+        logger.debug("[WorkflowEngine] 워크플로우 로드: %s", self.workflow.get('workflow_name', 'Unknown'))
         return self.workflow
     
     def execute(self, trigger_context: dict = None) -> dict:
@@ -48,62 +173,25 @@ class WorkflowEngine:
         self.context["workflow.name"] = self.workflow.get("workflow_name", "")
         self.context["workflow.timestamp"] = datetime.now().isoformat()
         
-        actions = self.workflow.get("actions", [])
-        results = []
+        if self._plan is None or self._plan_for is not self.workflow:
+            self._plan = _compile_plan(self.workflow)
+            self._plan_for = self.workflow
+        plan = self._plan
         
-        print(f"\n[WorkflowEngine] === 워크플로우 실행 시작 ===")
-        print(f"[WorkflowEngine] 총 {len(actions)}개 액션")
+        logger.info("[WorkflowEngine] === 워크플로우 실행 시작 === (총 %d개 액션)", len(plan))
         
-        for i, action in enumerate(actions, 1):
-            step_id = action.get("id", f"step{i}")
-            tool_name = action.get("tool")
-            description = action.get("description", "")
-            args = action.get("args", {})
-            
-            print(f"\n[WorkflowEngine] [{i}/{len(actions)}] {step_id}: {tool_name}")
-            if description:
-                print(f"[WorkflowEngine]    └─ {description}")
-            
-            # 인자에서 변수 치환
-            resolved_args = self._resolve_variables(args)
-            
-            try:
-                # 도구 실행
-                result = tool_registry.execute(tool_name, **resolved_args)
-                
-                # 결과를 컨텍스트에 저장
-                self.context[f"{step_id}.result"] = result.get("result", "")
-                self.context[f"{step_id}.success"] = result.get("success", False)
-                
-                results.append({
-                    "step_id": step_id,
-                    "tool": tool_name,
-                    "success": result.get("success", False),
-                    "result": result
-                })
-                
-                if result.get("success"):
-                    print(f"[WorkflowEngine]    ✅ 성공")
-                else:
-                    print(f"[WorkflowEngine]    ❌ 실패: {result.get('error', 'Unknown error')}")
-                    # 실패 시 워크플로우 중단 (선택적)
-                    if action.get("stop_on_fail", True):
-                        break
-                        
-            except Exception as e:
-                error_msg = str(e)
-                print(f"[WorkflowEngine]    ❌ 예외: {error_msg}")
-                results.append({
-                    "step_id": step_id,
-                    "tool": tool_name,
-                    "success": False,
-                    "error": error_msg
-                })
-                break
+        if self.workflow.get("parallel", False):
+            results = self._execute_parallel(plan)
+        else:
+            results = []
+            for i, step in enumerate(plan, 1):
+                entry, stop = self._run_step(i, step, len(plan))
+                results.append(entry)
+                if stop:
+                    break
         
         success_count = sum(1 for r in results if r.get("success"))
-        print(f"\n[WorkflowEngine] === 워크플로우 완료 ===")
-        print(f"[WorkflowEngine] 성공: {success_count}/{len(results)}")
+        logger.info("[WorkflowEngine] === 워크플로우 완료 === (성공: %d/%d)", success_count, len(results))
         
         return {
             "success": all(r.get("success") for r in results),
@@ -111,38 +199,149 @@ class WorkflowEngine:
             "context": self.context
         }
     
+    def _run_step(self, i: int, step: CompiledAction, total: int) -> tuple:
+        """
+        액션 하나 실행
+        
+        Returns:
+            (결과 항목, 이후 단계를 중단해야 하는지 여부)
+        """
+        step_id = step.step_id
+        tool_name = step.tool
+        
+        logger.debug("[WorkflowEngine] [%d/%d] %s: %s", i, total, step_id, tool_name)
+        if step.description:
+            logger.debug("[WorkflowEngine]    └─ %s", step.description)
+        
+        # 인자에서 변수 치환 (변수가 없는 액션은 원본 인자 그대로)
+        resolved_args = step.static_args
+        if resolved_args is None:
+            with self._context_lock:
+                resolved_args = self._resolve_compiled(step.args)
+        
+        try:
+            # 도구 실행
+            result = tool_registry.execute(tool_name, **resolved_args)
+            
+            # 결과를 컨텍스트에 저장
+            with self._context_lock:
+                self.context[f"{step_id}.result"] = result.get("result", "")
+                self.context[f"{step_id}.success"] = result.get("success", False)
+            
+            entry = {
+                "step_id": step_id,
+                "tool": tool_name,
+                "success": result.get("success", False),
+                "result": result
+            }
+            
+            if result.get("success"):
+                logger.debug("[WorkflowEngine]    ✅ 성공")
+                return entry, False
+            logger.warning("[WorkflowEngine] %s ❌ 실패: %s", step_id, result.get('error', 'Unknown error'))
+            # 실패 시 워크플로우 중단 (선택적)
+            return entry, step.stop_on_fail
+                    
+        except Exception as e:
+            error_msg = str(e)
+            logger.error("[WorkflowEngine] %s ❌ 예외: %s", step_id, error_msg)
+            return {
+                "step_id": step_id,
+                "tool": tool_name,
+                "success": False,
+                "error": error_msg
+            }, True
+    
+    def _execute_parallel(self, plan: tuple) -> list:
+        """
+        서로 의존하지 않는 액션을 동시에 실행 (워크플로우에 "parallel": true 일 때)
+        
+        인자에서 {stepN.result} 처럼 앞 단계를 참조하면 그 단계가 끝난 뒤에 실행합니다.
+        변수로 드러나지 않는 의존 관계(같은 파일을 쓰고 읽는 등)는 알 수 없으므로 기본은 순차 실행입니다.
+        중단 조건(stop_on_fail/예외)이 생기면 아직 시작하지 않은 액션은 실행하지 않습니다.
+        """
+        total = len(plan)
+        
+        # 각 액션이 참조하는 앞 단계 순번 (뒤 단계 참조는 순차 실행에서도 값이 없으므로 무시)
+        deps = []
+        for i, step in enumerate(plan):
+            refs = {name.split(".", 1)[0] for name in step.refs}
+            deps.append({j for j in range(i) if plan[j].step_id in refs})
+        
+        results = {}
+        done = set()
+        waiting = list(range(total))
+        running = {}  # future -> 순번
+        stopped = False
+        
+        with ThreadPoolExecutor(max_workers=min(8, total) or 1) as pool:
+            while True:
+                if not stopped:
+                    ready = [i for i in waiting if deps[i] <= done]
+                    for i in ready:
+                        waiting.remove(i)
+                        running[pool.submit(self._run_step, i + 1, plan[i], total)] = i
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    i = running.pop(future)
+                    results[i], stop = future.result()
+                    done.add(i)
+                    stopped = stopped or stop
+        
+        # 결과는 워크플로우에 적힌 순서대로
+        return [results[i] for i in sorted(results)]
+    
     def _resolve_variables(self, args: dict) -> dict:
         """
         인자에서 {variable} 형태의 변수를 실제 값으로 치환
         
         예: {"content": "{step1.result}"} -> {"content": "실제 파일 내용"}
         """
+        return self._resolve_compiled(_compile_args(args))
+    
+    def _resolve_compiled(self, compiled: tuple) -> dict:
+        """
+        _compile_args 결과에 현재 컨텍스트 값을 채워 실제 인자 dict 생성
+        
+        중첩 딕셔너리는 재귀 호출 대신 작업 스택으로 처리합니다.
+        """
+        context = self.context
         resolved = {}
+        stack = [(compiled, resolved)]
         
-        for key, value in args.items():
-            if isinstance(value, str):
-                # {variable} 패턴 찾기
-                pattern = r'\{([^}]+)\}'
-                matches = re.findall(pattern, value)
-                
-                resolved_value = value
-                for match in matches:
-                    if match in self.context:
-                        context_value = self.context[match]
-                        # 전체 값이 변수 하나면 타입 유지, 아니면 문자열로 치환
-                        if value == f"{{{match}}}":
-                            resolved_value = context_value
-                        else:
-                            resolved_value = resolved_value.replace(f"{{{match}}}", str(context_value))
+        while stack:
+            items, target = stack.pop()
+            for key, kind, payload in items:
+                if kind == _CONST:
+                    target[key] = payload
+                elif kind == _COPY:
+                    target[key] = copy.deepcopy(payload)
+                elif kind == _VAR:
+                    # 전체 값이 변수 하나면 타입 유지
+                    if payload in context:
+                        target[key] = context[payload]
                     else:
-                        print(f"[WorkflowEngine]    ⚠️ 변수 '{match}' 를 찾을 수 없음")
-                
-                resolved[key] = resolved_value
-            elif isinstance(value, dict):
-                # 중첩 딕셔너리 처리
-                resolved[key] = self._resolve_variables(value)
-            else:
-                resolved[key] = value
+                        logger.warning("[WorkflowEngine]    ⚠️ 변수 '%s' 를 찾을 수 없음", payload)
+                        target[key] = "{" + payload + "}"
+                elif kind == _TMPL:
+                    # 문자열 안의 변수는 문자열로 치환 (없으면 원문 유지)
+                    parts, tail = payload
+                    pieces = []
+                    for literal, name, raw in parts:
+                        pieces.append(literal)
+                        if name in context:
+                            pieces.append(str(context[name]))
+                        else:
+                            logger.warning("[WorkflowEngine]    ⚠️ 변수 '%s' 를 찾을 수 없음", name)
+                            pieces.append(raw)
+                    pieces.append(tail)
+                    target[key] = "".join(pieces)
+                else:
+                    # 중첩 딕셔너리: 키 순서를 지키도록 자리를 먼저 만들고 나중에 채움
+                    child = target[key] = {}
+                    stack.append((payload, child))
         
         return resolved
     